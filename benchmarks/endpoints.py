@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
+from datetime import date
+from pathlib import Path
+from statistics import quantiles
+from typing import Any
+
+import uvicorn
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient, ConnectError
+
+from benchmarks.utils import dump, report
+from src.db.db_manager import AsyncpgManager
+from src.dependencies import get_db_settings
+from src.main import create_app
+from src.persons.data_access_layer import PersonAsyncpgDAL
+from src.persons.dependencies import get_fakerapi_bulk_client, get_fakerapi_client
+from src.persons.schemas import PersonCreate
+from tests.utils.clients import get_mock_bulk_client, get_mock_client
+
+SIZES: tuple[int, ...] = (1_000, 100_000, 1_000_000)
+REQUESTS: int = 500
+CONCURRENCY: int = 10
+SEED_BATCH: int = 100_000
+TOLERANCE: float = 0.25
+
+RESULTS: Path = Path(__file__).parent / "results" / "endpoints.json"
+BASELINE: Path = Path(__file__).parent / "baselines" / "endpoints.json"
+
+PERSON: dict[str, str] = {"firstname": "Rosa", "lastname": "Sanford", "birthday": "1999-03-16", "gender": "female"}
+ENDPOINTS: dict[str, dict[str, Any]] = {
+    "GET /api/persons": {},
+    "GET /api/persons/search": {"params": {"q": "Sanf"}},
+    "POST /api/persons": {},
+    "GET /api/reports": {},
+    "POST /api/reports": {"json": [PERSON] * 100},
+}
+
+
+def build_app(*, cache: bool) -> FastAPI:
+    if not cache:
+        os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+    # Settings are read when the app is built, so they are changed before.
+    app = create_app()
+    app.dependency_overrides[get_fakerapi_client] = get_mock_client
+    app.dependency_overrides[get_fakerapi_bulk_client] = get_mock_bulk_client
+    return app
+
+
+async def seed(size: int) -> None:
+    person = PersonCreate.model_construct(
+        first_name="Rosa",
+        last_name="Sanford",
+        gender="female",
+        birthdate=date(1999, 3, 16),
+    )
+
+    manager = AsyncpgManager(settings=get_db_settings().model_copy(update={"listen_changes": False}))
+    async with manager:
+        async with manager.get_conn() as conn:
+            await conn.execute("TRUNCATE person")
+        for start in range(0, size, SEED_BATCH):
+            async with manager.get_conn() as conn:
+                await PersonAsyncpgDAL(_conn=conn).write_many([person] * min(SEED_BATCH, size - start))
+
+
+def serve(port: int, *, cache: bool) -> None:
+    uvicorn.run(build_app(cache=cache), host="127.0.0.1", port=port, log_level="warning")
+
+
+@asynccontextmanager
+async def in_process(*, cache: bool) -> AsyncGenerator[AsyncClient]:
+    async with (
+        LifespanManager(build_app(cache=cache)) as manager,
+        AsyncClient(transport=ASGITransport(app=manager.app), base_url="http://test") as session,
+    ):
+        yield session
+
+
+@asynccontextmanager
+async def over_socket(*, cache: bool) -> AsyncGenerator[AsyncClient]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = multiprocessing.get_context("spawn").Process(target=serve, args=(port,), kwargs={"cache": cache})
+    server.start()
+    try:
+        async with AsyncClient(base_url=f"http://127.0.0.1:{port}", headers={"Host": "localhost"}) as session:
+            for _ in range(100):
+                try:
+                    await session.get("/metrics")
+                    break
+                except ConnectError:
+                    await asyncio.sleep(0.1)
+
+            yield session
+    finally:
+        server.terminate()
+        server.join()
+
+
+async def load(session: AsyncClient, endpoint: str, requests: int, concurrency: int) -> dict[str, float]:
+    method, path = endpoint.split()
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await session.request(method, path, **ENDPOINTS[endpoint])
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    percentiles = quantiles(latencies, n=100, method="inclusive")
+    return {
+        "rps": requests / elapsed,
+        "p50": percentiles[49] * 1e6,
+        "p95": percentiles[94] * 1e6,
+        "p99": percentiles[98] * 1e6,
+    }
+
+
+async def run(
+    client: Callable[..., Any],
+    size: int,
+    requests: int,
+    concurrency: int,
+    *,
+    cache: bool,
+) -> dict[str, dict[str, float]]:
+    await seed(size)
+    async with client(cache=cache) as session:
+        return {endpoint: await load(session, endpoint, requests, concurrency) for endpoint in ENDPOINTS}
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], tolerance: float) -> list[str]:
+    regressions = []
+    for key, result in results.items():
+        if (expected := baseline.get(key)) is None:
+            continue
+        if result["rps"] < expected["rps"] * (1 - tolerance):
+            regressions.append(f"{key}: {result['rps']:,.0f} req/s, baseline is {expected['rps']:,.0f}")
+        if result["p95"] > expected["p95"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 is {result['p95']:,.0f} us, baseline is {expected['p95']:,.0f}")
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput and latency of all endpoints against a local Postgres.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--requests", type=int, default=REQUESTS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--modes", nargs="+", choices=("in-process", "socket"), default=("in-process", "socket"))
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--output", type=Path, default=RESULTS)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    clients = {"in-process": in_process, "socket": over_socket}
+    results, rows = {}, []
+    for mode in args.modes:
+        for size in args.sizes:
+            for endpoint, result in asyncio.run(
+                run(clients[mode], size, args.requests, args.concurrency, cache=args.cache),
+            ).items():
+                results[f"{mode} {endpoint} {size}"] = result
+                rows.append((mode, endpoint, size, *result.values()))
+
+    report("Endpoints", ("mode", "endpoint", "persons", "requests/sec", "p50, us", "p95, us", "p99, us"), rows)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    dump(str(args.output), results)
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        dump(str(args.baseline), results)
+        return
+
+    if args.baseline.exists() and (
+        regressions := compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    ):
+        print("\nRegressions:", *regressions, sep="\n")  # noqa: T201
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
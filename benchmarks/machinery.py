@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+from collections.abc import AsyncGenerator, Callable, Coroutine
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import date
+from functools import partial
+from typing import Any
+from uuid import uuid4
+
+from fastapi.dependencies.utils import solve_dependencies
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from pydantic.alias_generators import to_camel
+from starlette.requests import Request
+
+from benchmarks.utils import measure, report, trace
+from src.dependencies import get_asyncpg_manager
+from src.errors import validation_handler
+from src.main import create_app
+from src.persons.schemas import Person
+from src.schemas import ManyTransformer, OneTransformer
+
+ROWS: tuple[int, ...] = (1, 100, 10_000)
+ERRORS: tuple[int, ...] = (1, 1000)
+CALLS: int = 1000
+
+Case = tuple[str, str, int, Callable[[], Any]]
+
+
+def transformer_cases(rows: int) -> list[Case]:
+    records = [
+        {
+            "id": uuid4(),
+            "first_name": "Rosa",
+            "last_name": "Sanford",
+            "gender": "female",
+            "birthdate": date(1999, 3, 16),
+        }
+        for _ in range(rows)
+    ]
+    persons = ManyTransformer[Person](trusted=True)(records, Person)
+    one, trusted_one = OneTransformer[Person](), OneTransformer[Person](trusted=True)
+
+    return [
+        (f"to rows, {rows}", "to_tuple", rows, lambda: [tuple(person.model_dump().values()) for person in persons]),
+        (f"from rows, {rows}", "OneTransformer", rows, lambda: [one(record, Person) for record in records]),
+        (
+            f"from rows, {rows}",
+            "OneTransformer trusted",
+            rows,
+            lambda: [trusted_one(record, Person) for record in records],
+        ),
+        (f"from rows, {rows}", "ManyTransformer", rows, lambda: ManyTransformer[Person]()(records, Person)),
+        (
+            f"from rows, {rows}",
+            "ManyTransformer trusted",
+            rows,
+            lambda: ManyTransformer[Person](trusted=True)(records, Person),
+        ),
+        (f"to JSON, {rows}", "by alias", rows, lambda: [person.model_dump_json(by_alias=True) for person in persons]),
+        (f"to JSON, {rows}", "by name", rows, lambda: [person.model_dump_json() for person in persons]),
+    ]
+
+
+def alias_cases() -> list[Case]:
+    fields = list(Person.model_fields)
+    return [("alias generation", "to_camel", len(fields), lambda: [to_camel(field) for field in fields])]
+
+
+class NoConnManager:
+    @asynccontextmanager
+    async def get_conn(self, **kwargs: Any) -> AsyncGenerator[object]:
+        # Each request gets its own connection proxy from the pool, so a fresh object stands for it.
+        yield object()
+
+
+def dependency_cases(loop: asyncio.AbstractEventLoop) -> list[Case]:
+    app = create_app()
+    manager = NoConnManager()
+    app.dependency_overrides[get_asyncpg_manager] = lambda: manager
+    # The prefetcher is started by the lifespan, which is not run here, so a stand-in is enough to resolve it.
+    app.state.person_prefetcher = object()
+
+    cases: list[Case] = []
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path.startswith("/api"):
+            method = next(iter(route.methods))
+            request = Request(
+                {"type": "http", "app": app, "method": method, "path": route.path, "query_string": b"", "headers": []},
+            )
+
+            async def resolve(route: APIRoute = route, request: Request = request) -> None:
+                async with AsyncExitStack() as stack:
+                    await solve_dependencies(
+                        request=request,
+                        dependant=route.dependant,
+                        dependency_overrides_provider=app,
+                        async_exit_stack=stack,
+                        embed_body_fields=False,
+                    )
+
+            def run(resolve: Callable[[], Coroutine[Any, Any, None]] = resolve) -> None:
+                loop.run_until_complete(resolve())
+
+            cases.append(
+                (
+                    "DI resolution",
+                    f"{method} {route.path}",
+                    1,
+                    run,
+                ),
+            )
+
+    return cases
+
+
+def error_cases(loop: asyncio.AbstractEventLoop, count: int) -> list[Case]:
+    exc = RequestValidationError(
+        [
+            {"type": "missing", "loc": ("body", i, "firstName"), "msg": "Field required", "input": {}}
+            for i in range(count)
+        ],
+    )
+    return [
+        (
+            f"validation errors, {count}",
+            "validation_handler",
+            count,
+            lambda: loop.run_until_complete(validation_handler(None, exc)),  # type: ignore[arg-type]
+        ),
+    ]
+
+
+def call_many(func: Callable[[], Any], calls: int) -> None:
+    for _ in range(calls):
+        func()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time and allocations of schemas, dependencies and errors machinery.")
+    parser.add_argument("--rows", type=int, nargs="+", default=ROWS)
+    parser.add_argument("--errors", type=int, nargs="+", default=ERRORS)
+    parser.add_argument("--calls", type=int, default=CALLS)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    cases = [
+        *(case for rows in args.rows for case in transformer_cases(rows)),
+        *alias_cases(),
+        *dependency_cases(loop),
+        *(case for count in args.errors for case in error_cases(loop, count)),
+    ]
+
+    results = []
+    for group, name, size, func in cases:
+        calls = max(1, args.calls // size)
+        elapsed = measure(partial(call_many, func, calls)) / calls
+        peak, blocks = trace(func)
+        results.append((group, name, elapsed * 1e9, peak / 1024, blocks))
+
+    loop.close()
+    report("Machinery", ("case", "implementation", "ns/call", "peak, KiB", "blocks left"), results)
+
+
+if __name__ == "__main__":
+    main()
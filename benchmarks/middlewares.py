@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from pydantic_extra_types.semantic_version import SemanticVersion
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Message
+
+from benchmarks.utils import report
+from src.dependencies import get_cors_settings, get_docs_settings, get_trusted_hosts_settings
+from src.main import create_app
+
+REQUESTS: int = 20_000
+
+
+class LegacyVersionMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app: ASGIApp, version: SemanticVersion) -> None:
+        super().__init__(app)
+        self.version: SemanticVersion = version
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        response = await call_next(request)
+        response.headers["X-Version"] = str(self.version)
+
+        return response
+
+
+def build(middlewares: list[Middleware]) -> FastAPI:
+    app_ = FastAPI()
+    app_.user_middleware = middlewares
+
+    @app_.get("/ping")
+    def ping() -> Response:
+        return Response(b"pong")
+
+    return app_
+
+
+async def run(app_: FastAPI, requests: int) -> float:
+    scope: dict[str, Any] = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 1),
+        "server": ("localhost", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app_(dict(scope), receive, send)
+
+    return (time.perf_counter() - start) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-request overhead of the middleware stack.")
+    parser.add_argument("--requests", type=int, default=REQUESTS)
+    args = parser.parse_args()
+
+    # The stack the application had before its middlewares were rewritten as pure ASGI ones.
+    legacy = [
+        Middleware(LegacyVersionMiddleware, version=get_docs_settings().version),
+        Middleware(GZipMiddleware),
+        Middleware(CORSMiddleware, **get_cors_settings().model_dump(by_alias=True, exclude_none=True)),
+        Middleware(TrustedHostMiddleware, **get_trusted_hosts_settings().model_dump(by_alias=True, exclude_none=True)),
+    ]
+    stacks = {
+        "no middlewares": [],
+        "GZip + BaseHTTP": legacy,
+        "pure ASGI": create_app().user_middleware,
+    }
+
+    rows = []
+    for name, middlewares in stacks.items():
+        overhead = asyncio.run(run(build(middlewares), args.requests))
+        rows.append((name, overhead * 1e6, 1 / overhead))
+
+    report("Middleware stack", ("stack", "us/request", "requests/sec"), rows)
+
+
+if __name__ == "__main__":
+    main()
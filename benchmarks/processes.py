@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import AsyncExitStack
+
+from benchmarks.utils import report
+from src.executors import ProcessPool
+from src.reports.service import ReportBuildingService
+
+PERSONS: tuple[int, ...] = (10_000, 100_000, 500_000)
+PROCESSES: tuple[int, ...] = (0, 1, 2, 4, 8)
+CHUNK_SIZE: int = 10_000
+RUNS: int = 3
+
+PERSON: dict[str, str] = {"firstName": "Rosa", "lastName": "Sanford", "gender": "female", "birthdate": "1999-03-16"}
+
+
+async def build(bodies: list[bytes], processes: int, chunk_size: int, runs: int) -> list[float]:
+    process_pool = ProcessPool(size=processes) if processes else None
+    service = ReportBuildingService(process_pool=process_pool, threshold=0, chunk_size=chunk_size)
+
+    timings = []
+    async with AsyncExitStack() as stack:
+        if process_pool is not None:
+            await stack.enter_async_context(process_pool)
+
+        for body in bodies:
+            elapsed = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                await service.create_custom_report(body)
+                elapsed.append(time.perf_counter() - start)
+            timings.append(min(elapsed))
+
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Custom report building in-process and on a pool of processes.")
+    parser.add_argument("--persons", type=int, nargs="+", default=PERSONS)
+    parser.add_argument("--processes", type=int, nargs="+", default=PROCESSES, help="0 builds in-process")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--runs", type=int, default=RUNS)
+    args = parser.parse_args()
+
+    bodies = [json.dumps([PERSON] * persons).encode() for persons in args.persons]
+    results = {
+        processes: asyncio.run(build(bodies, processes, args.chunk_size, args.runs)) for processes in args.processes
+    }
+    in_process = results.get(0)
+
+    report(
+        f"Custom report, {os.cpu_count()} CPUs",
+        ("processes", "persons", "ms", "speedup, %"),
+        [
+            (
+                processes or "in-process",
+                persons,
+                timing * 1e3,
+                in_process[index] / timing * 100 if in_process is not None else "-",
+            )
+            for processes, timings in results.items()
+            for index, (persons, timing) in enumerate(zip(args.persons, timings, strict=True))
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import random
+import time
+from datetime import date
+from statistics import quantiles
+
+from benchmarks.utils import report
+from src.db.db_manager import AsyncpgManager
+from src.dependencies import get_db_settings, get_search_settings
+from src.persons.data_access_layer import PersonAsyncpgDAL
+from src.persons.schemas import PersonCreate
+
+PERSONS: int = 1_000_000
+QUERIES: int = 200
+LIMIT: int = 10
+SEED_BATCH: int = 100_000
+
+CONSONANTS: tuple[str, ...] = (*"bcdfghjklmnprstvwz", "ch", "sh", "th", "st", "br", "tr", "gr", "kl")
+VOWELS: tuple[str, ...] = (*"aeiouy", "ai", "ea", "ie", "oo")
+ENDINGS: tuple[str, ...] = ("", "n", "r", "s", "th", "ll", "ck", "son", "ford")
+
+
+def make_name(rand: random.Random) -> str:
+    syllables = "".join(rand.choice(CONSONANTS) + rand.choice(VOWELS) for _ in range(rand.randint(2, 3)))
+    return (syllables + rand.choice(ENDINGS)).capitalize()
+
+
+async def seed(manager: AsyncpgManager, persons: int, rand: random.Random) -> tuple[list[str], list[str]]:
+    # First names follow Zipf's law, so the most common of them belong to a tenth of persons, as in real data.
+    first_names = [make_name(rand) for _ in range(5_000)]
+    last_names = [make_name(rand) for _ in range(50_000)]
+    weights = [1 / rank for rank in range(1, len(first_names) + 1)]
+
+    async with manager.get_conn() as conn:
+        await conn.execute("TRUNCATE person")
+    for start in range(0, persons, SEED_BATCH):
+        size = min(SEED_BATCH, persons - start)
+        async with manager.get_conn() as conn:
+            await PersonAsyncpgDAL(_conn=conn).write_many(
+                [
+                    PersonCreate.model_construct(
+                        first_name=first_name,
+                        last_name=rand.choice(last_names),
+                        gender="female",
+                        birthdate=date(1999, 3, 16),
+                    )
+                    for first_name in rand.choices(first_names, weights=weights, k=size)
+                ],
+            )
+    async with manager.get_conn(read_only=True) as conn:
+        await conn.execute("VACUUM ANALYZE person, person_name")
+
+    return first_names, last_names
+
+
+def make_queries(first_names: list[str], last_names: list[str], rand: random.Random) -> dict[str, list[str]]:
+    def typo(name: str) -> str:
+        index = rand.randrange(1, len(name) - 1)
+        return name[:index] + name[index + 1] + name[index] + name[index + 2 :]
+
+    return {
+        "common first name": first_names[:10],
+        "common first name beginning": [name[:3] for name in first_names[:10]],
+        "rare first name": rand.sample(first_names[1000:], 10),
+        "last name": rand.sample(last_names, 10),
+        "last name beginning": [name[:4] for name in rand.sample(last_names, 10)],
+        "last name with a typo": [typo(name) for name in rand.sample(last_names, 10)],
+        "full name beginning": [
+            f"{first_name} {last_name[:3]}"
+            for first_name, last_name in zip(first_names[:10], rand.sample(last_names, 10), strict=True)
+        ],
+        "no match": ["xqz", "qwxv", "zzzz", "xxyyz", "jjjq", "vvxq", "qqq", "xjx", "zqx", "wqw"],
+    }
+
+
+async def run(persons: int, queries: int, limit: int) -> list[tuple[str, int, float, float, float]]:
+    rand = random.Random(0)  # noqa: S311
+    manager = AsyncpgManager(settings=get_db_settings().model_copy(update={"listen_changes": False}))
+    async with manager:
+        kinds = make_queries(*await seed(manager, persons, rand), rand)
+
+        results = []
+        async with manager.get_conn(read_only=True) as conn:
+            dal = PersonAsyncpgDAL(_conn=conn)
+            for kind, texts in kinds.items():
+                latencies, found = [], 0
+                for i in range(queries):
+                    start = time.perf_counter()
+                    found += len(await dal.search(texts[i % len(texts)], limit, get_search_settings().timeout))
+                    latencies.append(time.perf_counter() - start)
+
+                percentiles = quantiles(latencies, n=100, method="inclusive")
+                results.append(
+                    (kind, found // queries, percentiles[49] * 1e6, percentiles[94] * 1e6, percentiles[98] * 1e6),
+                )
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latency of the persons search against a local Postgres.")
+    parser.add_argument("--persons", type=int, default=PERSONS)
+    parser.add_argument("--queries", type=int, default=QUERIES)
+    parser.add_argument("--limit", type=int, default=LIMIT)
+    args = parser.parse_args()
+
+    report(
+        f"Search, {args.persons:,} persons",
+        ("query", "found", "p50, us", "p95, us", "p99, us"),
+        asyncio.run(run(args.persons, args.queries, args.limit)),
+    )
+
+
+if __name__ == "__main__":
+    main()
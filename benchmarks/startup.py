@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.utils import report
+
+RUNS: int = 5
+
+
+async def stages() -> dict[str, float]:
+    timings = {}
+
+    start = time.perf_counter()
+    main = importlib.import_module("src.main")
+    timings["import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app = main.create_app()
+    timings["create_app"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    async with LifespanManager(app) as manager:
+        timings["startup"] = time.perf_counter() - start
+
+        async with AsyncClient(transport=ASGITransport(app=manager.app), base_url="http://test") as session:
+            for path in "/api/persons", "/openapi.json":
+                start = time.perf_counter()
+                await session.get(path, headers={"Accept-Encoding": "gzip"})
+                timings[f"first GET {path}"] = time.perf_counter() - start
+
+    return timings
+
+
+def measure_stages() -> dict[str, float]:
+    return asyncio.run(stages())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import, startup and first requests time of a fresh process.")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAPI", "/openapi.json")
+    runs = []
+    for _ in range(args.runs):
+        # A spawned process imports the application from scratch.
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            runs.append(executor.submit(measure_stages).result())
+
+    report("Startup", ("stage", "ms"), [(stage, min(run[stage] for run in runs) * 1e3) for stage in runs[0]])
+
+
+if __name__ == "__main__":
+    main()
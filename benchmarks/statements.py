@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+import time
+
+from benchmarks.utils import report
+from src.db.db_manager import AsyncpgManager
+from src.dependencies import get_db_settings
+from src.persons.data_access_layer import PersonAsyncpgDAL
+from src.settings import DBSettings
+
+QUERIES: int = 10_000
+
+
+async def run(settings: DBSettings, queries: int) -> float:
+    manager = AsyncpgManager(settings=settings)
+    async with manager:
+        start = time.perf_counter()
+        # Every query gets its own connection from the pool, as every request does.
+        for _ in range(queries):
+            async with manager.get_conn(read_only=True) as conn:
+                await PersonAsyncpgDAL(_conn=conn).read_page(10)
+
+        return queries / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Statements/sec of DAL queries against a local Postgres.")
+    parser.add_argument("--queries", type=int, default=QUERIES)
+    args = parser.parse_args()
+
+    results = []
+    for mode, prepare in ("asyncpg cache", False), ("prepared at init", True):
+        settings = get_db_settings().model_copy(update={"prepare_statements": prepare})
+        results.append((mode, asyncio.run(run(settings, args.queries))))
+
+    report("Prepared statements", ("mode", "statements/sec"), results)
+
+
+if __name__ == "__main__":
+    main()
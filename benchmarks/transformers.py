@@ -0,0 +1,40 @@
+import argparse
+from datetime import date
+from uuid import uuid4
+
+from benchmarks.utils import measure, report
+from src.persons.schemas import Person
+from src.schemas import ManyTransformer
+
+ROWS: tuple[int, ...] = (10_000, 1_000_000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rows/sec of DB rows to schemas conversion.")
+    parser.add_argument("--rows", type=int, nargs="+", default=ROWS)
+    args = parser.parse_args()
+
+    results = []
+    for count in args.rows:
+        rows = [
+            {
+                "id": uuid4(),
+                "first_name": "Rosa",
+                "last_name": "Sanford",
+                "gender": "female",
+                "birthdate": date(1999, 3, 16),
+            }
+            for _ in range(count)
+        ]
+
+        for mode, transformer in (
+            ("validated", ManyTransformer[Person]()),
+            ("trusted", ManyTransformer[Person](trusted=True)),
+        ):
+            results.append((count, mode, count / measure(lambda: transformer(rows, Person))))  # noqa: B023
+
+    report("DB rows to schemas", ("rows", "mode", "rows/sec"), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import json
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+def measure(func: Callable[[], Any], repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def trace(func: Callable[[], Any]) -> tuple[int, int]:
+    ignored = (tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(ignored)
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(ignored)
+    finally:
+        tracemalloc.stop()
+
+    return peak - current, sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+
+def report(title: str, columns: Iterable[str], rows: Iterable[Iterable[Any]]) -> None:
+    print(f"\n{title}")  # noqa: T201
+    print(" | ".join(f"{column:>18}" for column in columns))  # noqa: T201
+    for row in rows:
+        print(" | ".join(f"{value:>18,.0f}" if isinstance(value, float) else f"{value!s:>18}" for value in row))  # noqa: T201
+
+
+def dump(path: str, results: Any) -> None:
+    with open(path, "w", encoding="utf-8") as file:  # noqa: PTH123
+        json.dump(results, file, indent=4, default=str)
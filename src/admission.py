@@ -0,0 +1,102 @@
+from asyncio import Semaphore, timeout
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from math import ceil
+from time import monotonic
+from types import TracebackType
+
+from src.errors import OverloadedError
+from src.metrics import ADMISSION_DECISIONS, ADMISSION_REQUESTS, ADMISSION_WAIT_SECONDS
+
+SMOOTHING: float = 0.1
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class RouteClass:
+    limit: int
+
+    active: int = 0
+    waiting: int = 0
+    duration: float = 0.0
+    semaphore: Semaphore | None = None
+
+    def get_wait(self) -> float:
+        if self.active + self.waiting < self.limit:
+            return 0.0
+
+        # Every slot is freed once per request duration on average, and the waiting requests go first.
+        return (self.waiting + 1) * self.duration / self.limit
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class AdmissionController:
+    limits: Mapping[str, int]
+    budget: float
+    capacity: int
+    get_pool_wait: Callable[[], float] = lambda: 0.0
+
+    route_classes: dict[str, RouteClass] = field(init=False)
+
+    def __post_init__(self) -> None:
+        # Otherwise admitted requests of different classes could still queue for connections.
+        if sum(self.limits.values()) > self.capacity:
+            raise ValueError("Admission limits exceed the size of the connection pool.")
+
+        self.route_classes = {name: RouteClass(limit=limit) for name, limit in self.limits.items()}
+        ADMISSION_REQUESTS.collect = self._collect
+
+    async def acquire(self, name: str) -> float:
+        route_class = self.route_classes[name]
+        assert route_class.semaphore is not None
+
+        if (wait := route_class.get_wait() + self.get_pool_wait()) > self.budget:
+            ADMISSION_DECISIONS.inc(name, "rejected")
+            raise OverloadedError(retry_after=ceil(wait))
+
+        start = monotonic()
+        route_class.waiting += 1
+        try:
+            async with timeout(self.budget):
+                await route_class.semaphore.acquire()
+        except TimeoutError as exc:
+            ADMISSION_DECISIONS.inc(name, "expired")
+            raise OverloadedError(retry_after=ceil(route_class.get_wait()) or 1) from exc
+        finally:
+            route_class.waiting -= 1
+
+        route_class.active += 1
+        ADMISSION_DECISIONS.inc(name, "admitted")
+        ADMISSION_WAIT_SECONDS.observe(monotonic() - start, name)
+        return monotonic()
+
+    def release(self, name: str, admitted_at: float) -> None:
+        route_class = self.route_classes[name]
+        assert route_class.semaphore is not None
+
+        route_class.active -= 1
+        route_class.duration += SMOOTHING * (monotonic() - admitted_at - route_class.duration)
+        route_class.semaphore.release()
+
+    async def __aenter__(self) -> None:
+        # Semaphores are bound to the event loop of the application that uses them.
+        for route_class in self.route_classes.values():
+            route_class.active = route_class.waiting = 0
+            route_class.semaphore = Semaphore(route_class.limit)
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        pass
+
+    def _collect(self) -> dict[tuple[str, ...], float]:
+        values: dict[tuple[str, ...], float] = {}
+        for name, route_class in self.route_classes.items():
+            values |= {
+                (name, "limit"): route_class.limit,
+                (name, "active"): route_class.active,
+                (name, "waiting"): route_class.waiting,
+            }
+        return values
@@ -0,0 +1,100 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from time import monotonic
+
+from src.metrics import CACHE_LOOKUPS
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
+class CachedResponse:
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    etag: bytes
+    tags: frozenset[str]
+    created_at: float
+    expires_at: float
+
+    @staticmethod
+    def make_etag(body: bytes) -> bytes:
+        return b'"' + blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> CachedResponse | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, response: CachedResponse) -> None:
+        pass
+
+    @abstractmethod
+    async def invalidate(self, *tags: str) -> None:
+        pass
+
+
+@dataclass(kw_only=True, slots=True)
+class MemoryCacheBackend(CacheBackend):
+    size: int
+    lag: float = 0.0
+    used: int = 0
+    hits: int = 0
+    misses: int = 0
+    entries: OrderedDict[str, CachedResponse] = field(default_factory=OrderedDict)
+    invalidated_at: dict[str, float] = field(default_factory=dict)
+
+    async def get(self, key: str) -> CachedResponse | None:
+        if (response := self.entries.get(key)) is None or response.expires_at <= monotonic():
+            self.misses += 1
+            CACHE_LOOKUPS.inc("responses", "miss")
+            return None
+
+        self.hits += 1
+        CACHE_LOOKUPS.inc("responses", "hit")
+        self.entries.move_to_end(key)
+        return response
+
+    async def set(self, key: str, response: CachedResponse) -> None:
+        # A response started within the lag after an invalidation may have been read from a replica that had not applied
+        # the change yet.
+        if len(response.body) > self.size or any(
+            self.invalidated_at.get(tag, 0.0) + self.lag >= response.created_at for tag in response.tags
+        ):
+            return
+
+        self._pop(key)
+        self.entries[key] = response
+        self.used += len(response.body)
+        while self.used > self.size:
+            self._pop(next(iter(self.entries)))
+
+    async def invalidate(self, *tags: str) -> None:
+        self.invalidated_at |= dict.fromkeys(tags, monotonic())
+        for key in [key for key, response in self.entries.items() if not response.tags.isdisjoint(tags)]:
+            self._pop(key)
+
+    def _pop(self, key: str) -> None:
+        if (response := self.entries.pop(key, None)) is not None:
+            self.used -= len(response.body)
+
+
+@dataclass(kw_only=True, slots=True)
+class Invalidator:
+    subscribers: list[Callable[..., Awaitable[None]]] = field(default_factory=list)
+
+    def subscribe(self, callback: Callable[..., Awaitable[None]]) -> None:
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[..., Awaitable[None]]) -> None:
+        self.subscribers.remove(callback)
+
+    async def publish(self, tags: Iterable[str]) -> None:
+        tags = tuple(tags)
+        for callback in self.subscribers:
+            await callback(*tags)
+
+
+INVALIDATOR: Invalidator = Invalidator()
@@ -0,0 +1,155 @@
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Literal, Protocol
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+
+from src.metrics import CACHE_LOOKUPS
+
+CodecName = Literal["br", "zstd", "gzip"]
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, level: int) -> None:
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+@dataclass(frozen=True, slots=True)
+class Codec:
+    name: CodecName
+    compress: Callable[[bytes, int], bytes]
+    compressor: Callable[[int], Compressor]
+    best: int
+    default: int
+    fast: int
+
+
+CODECS: dict[CodecName, Codec] = {
+    "gzip": Codec(
+        name="gzip",
+        compress=lambda data, level: zlib.compress(data, level, wbits=31),
+        compressor=GzipCompressor,
+        best=9,
+        default=6,
+        fast=1,
+    ),
+}
+if brotli is not None:
+    CODECS["br"] = Codec(
+        name="br",
+        compress=lambda data, level: brotli.compress(data, quality=level),
+        compressor=BrotliCompressor,
+        best=11,
+        default=5,
+        fast=1,
+    )
+if zstandard is not None:
+    CODECS["zstd"] = Codec(
+        name="zstd",
+        compress=lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+        compressor=ZstdCompressor,
+        best=19,
+        default=3,
+        fast=1,
+    )
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str, codecs: tuple[CodecName, ...]) -> Codec | None:
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    for name in codecs:
+        if name in CODECS and accepted.get(name, wildcard) > 0:
+            return CODECS[name]
+
+    return None
+
+
+@dataclass(kw_only=True, slots=True)
+class CompressionCache:
+    size: int
+    used: int = 0
+    hits: int = 0
+    misses: int = 0
+    entries: OrderedDict[tuple[str, bytes], bytes] = field(default_factory=OrderedDict)
+
+    def compress(self, codec: Codec, body: bytes, level: int) -> bytes:
+        key = (codec.name, blake2b(body, digest_size=16).digest())
+
+        if (compressed := self.entries.get(key)) is not None:
+            self.hits += 1
+            CACHE_LOOKUPS.inc("compression", "hit")
+            self.entries.move_to_end(key)
+            return compressed
+
+        self.misses += 1
+        CACHE_LOOKUPS.inc("compression", "miss")
+        compressed = codec.compress(body, level)
+        if len(compressed) <= self.size:
+            self.entries[key] = compressed
+            self.used += len(compressed)
+            while self.used > self.size:
+                self.used -= len(self.entries.popitem(last=False)[1])
+
+        return compressed
+
+    def warm_up(self, body: bytes, codecs: Iterable[CodecName]) -> None:
+        for name in codecs:
+            if (codec := CODECS.get(name)) is not None:
+                self.compress(codec, body, codec.best)
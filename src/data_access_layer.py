@@ -1,19 +1,212 @@
 from abc import ABC
-from dataclasses import dataclass
+from collections.abc import AsyncGenerator, Awaitable, Callable, Coroutine, Sequence
+from dataclasses import dataclass, field
+from functools import partial, wraps
+from operator import attrgetter
+from time import monotonic
+from typing import Any, ClassVar, Concatenate, TypeVar, cast
 
 from asyncpg import Connection, Record
 
-from src.schemas import Schema, from_dicts
+from src.cache import INVALIDATOR
+from src.errors import CursorError
+from src.metrics import CACHE_LOOKUPS, QUERY_SECONDS
+from src.schemas import (
+    Page,
+    Schema,
+    decode_cursor,
+    encode_cursor,
+    from_batches,
+    from_dicts,
+    get_field_adapter,
+)
+
+AsyncpgDALT = TypeVar("AsyncpgDALT", bound="AsyncpgDAL")
 
 
 class DAL(ABC):
     schema: type[Schema]
+    keys: tuple[str, ...] = ("id",)
+
+    def _encode_cursor(self, item: Schema, keys: Sequence[str] | None = None) -> str:
+        return encode_cursor([getattr(item, key) for key in keys or self.keys])
+
+    def _decode_cursor(self, cursor: str, keys: Sequence[str] | None = None) -> list[Any]:
+        try:
+            return [
+                get_field_adapter(self.schema, key).validate_python(value)
+                for key, value in zip(keys or self.keys, decode_cursor(cursor), strict=True)
+            ]
+        except (TypeError, ValueError) as exc:
+            raise CursorError from exc
+
+
+class AsyncpgConnection(Connection):
+    __slots__ = ("after_commit",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.after_commit: list[Callable[[], Awaitable[None]]] = []
+
+    # Statements are kept in the cache asyncpg uses for every query, since it outlives releases of the connection to
+    # the pool, unlike objects returned by Connection.prepare.
+    def has_statement(self, query: str) -> bool:
+        return bool(self._stmt_cache.has((query, self._protocol.get_record_class(), False)))  # type: ignore[attr-defined]
+
+    async def prepare_statement(self, query: str) -> None:
+        await self._get_statement(query, None)  # type: ignore[attr-defined]
+
+
+@dataclass(kw_only=True, slots=True)
+class StatementRegistry:
+    hits: int = 0
+    misses: int = 0
+
+    def count(self, conn: AsyncpgConnection, query: str) -> None:
+        if conn.has_statement(query):
+            self.hits += 1
+            CACHE_LOOKUPS.inc("statements", "hit")
+        else:
+            self.misses += 1
+            CACHE_LOOKUPS.inc("statements", "miss")
+
+    @staticmethod
+    async def prepare(conn: AsyncpgConnection) -> None:
+        # Preparing takes locks on the tables, which are released only when a transaction ends.
+        async with conn.transaction():
+            for cls in AsyncpgDAL.__subclasses__():
+                for query in cls.statements.values():
+                    await conn.prepare_statement(query)
+
+
+STATEMENTS: StatementRegistry = StatementRegistry()
+
+
+def invalidates[AsyncpgDALT: AsyncpgDAL, **P, T](
+    func: Callable[Concatenate[AsyncpgDALT, P], Awaitable[T]],
+) -> Callable[Concatenate[AsyncpgDALT, P], Coroutine[Any, Any, T]]:
+    @wraps(func)
+    async def wrapper(self: AsyncpgDALT, *args: P.args, **kwargs: P.kwargs) -> T:
+        res = await func(self, *args, **kwargs)
+        await self._after_commit(partial(INVALIDATOR.publish, (self.table,)))
+
+        return res
+
+    return wrapper
 
 
 @dataclass(kw_only=True, frozen=True, slots=True)
 class AsyncpgDAL(DAL):
+    table: ClassVar[str]
+    statements: ClassVar[dict[str, str]] = {}
+
     _conn: Connection
 
-    @from_dicts()
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super(AsyncpgDAL, cls).__init_subclass__(**kwargs)
+        cls.table = cls.__dict__.get("table", cls.schema.__name__.lower())
+        cls.statements = cls.build_statements(cls.table, ", ".join(cls.keys))
+
+    @classmethod
+    def build_statements(cls, table: str, keys: str) -> dict[str, str]:
+        after = ", ".join(f"${i}" for i in range(2, len(cls.keys) + 2))
+
+        return {
+            "read_all": f"SELECT * FROM {table}",  # noqa: S608
+            "read_first": f"SELECT * FROM {table} ORDER BY {keys} LIMIT $1",  # noqa: S608
+            "read_after": f"SELECT * FROM {table} WHERE ({keys}) > ({after}) ORDER BY {keys} LIMIT $1",  # noqa: S608
+        }
+
+    async def _after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        if self._conn.is_in_transaction():
+            self._conn.after_commit.append(callback)  # type: ignore[attr-defined]
+        else:
+            await callback()
+
+    async def _run(self, method: str, name: str, *args: Any, query: str | None = None) -> Any:
+        query = self.statements[name] if query is None else query
+        start = monotonic()
+        STATEMENTS.count(cast("AsyncpgConnection", self._conn), query)
+        try:
+            return await getattr(self._conn, method)(query, *args)
+        finally:
+            QUERY_SECONDS.observe(monotonic() - start, type(self).__name__, name)
+
+    async def _fetch(self, name: str, *args: Any, query: str | None = None) -> list[Record]:
+        return cast("list[Record]", await self._run("fetch", name, *args, query=query))
+
+    async def _fetchrow(self, name: str, *args: Any) -> Record | None:
+        return cast("Record | None", await self._run("fetchrow", name, *args))
+
+    async def _fetchval(self, name: str, *args: Any) -> Any:
+        return await self._run("fetchval", name, *args)
+
+    @from_dicts(trusted=True)
     async def _read_all(self) -> list[Record]:
-        return await self._conn.fetch(f"SELECT * FROM {self.schema.__name__.lower()}")  # noqa: S608
+        return await self._fetch("read_all")
+
+    async def _write_many(self, schemas: Sequence[Schema]) -> None:
+        columns = tuple(self.schema.model_fields)
+        get_values = attrgetter(*columns)
+
+        start = monotonic()
+        try:
+            await self._conn.copy_records_to_table(
+                self.table,
+                records=map(get_values, schemas),
+                columns=columns,
+            )
+        finally:
+            QUERY_SECONDS.observe(monotonic() - start, type(self).__name__, "write_many")
+
+    @from_batches(trusted=True)
+    async def _stream_all(self, prefetch: int) -> AsyncGenerator[list[Record]]:
+        async for records in self._stream("read_all", prefetch):
+            yield records
+
+    async def _stream(self, name: str, prefetch: int, *args: Any) -> AsyncGenerator[list[Record]]:
+        async with self._conn.transaction():
+            query = self.statements[name]
+            STATEMENTS.count(cast("AsyncpgConnection", self._conn), query)
+            cursor = await self._conn.cursor(query, *args)
+
+            while records := await cursor.fetch(prefetch):
+                yield records
+
+    async def _read_page(self, limit: int, after: str | None = None) -> Page[Any]:
+        items = await self._read_after(limit + 1, None if after is None else self._decode_cursor(after))
+
+        return self._to_page(items, limit)
+
+    def _to_page(self, items: list[Any], limit: int, keys: Sequence[str] | None = None) -> Page[Any]:
+        if len(items) <= limit:
+            return Page[self.schema](items=items)  # type: ignore[name-defined]
+
+        items = items[:limit]
+        return Page[self.schema](items=items, next=self._encode_cursor(items[-1], keys))  # type: ignore[name-defined]
+
+    @from_dicts(trusted=True)
+    async def _read_after(self, limit: int, after: Sequence[Any] | None) -> list[Record]:
+        if after is None:
+            return await self._fetch("read_first", limit)
+        return await self._fetch("read_after", limit, *after)
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class AsyncpgUnitOfWork:
+    conn: Connection
+
+    dals: dict[type[AsyncpgDAL], AsyncpgDAL] = field(default_factory=dict)
+    closed: bool = False
+
+    def get_dal(self, cls: type[AsyncpgDALT]) -> AsyncpgDALT:
+        assert not self.closed
+
+        if (dal := self.dals.get(cls)) is None:
+            dal = self.dals[cls] = cls(_conn=self.conn)
+        return cast("AsyncpgDALT", dal)
+
+    def close(self) -> None:
+        # DALs are dropped together with the connection, which goes back to the pool.
+        self.dals.clear()
+        self.closed = True
@@ -1,16 +1,26 @@
 from abc import ABC, abstractmethod
-from asyncio import CancelledError
-from collections.abc import AsyncGenerator
+from asyncio import CancelledError, Task, create_task, gather, sleep
+from collections.abc import AsyncGenerator, Coroutine
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from time import monotonic
 from types import TracebackType
-from typing import Any
+from typing import Any, Literal, cast
 
-from asyncpg import Pool, create_pool
+from asyncpg import Connection, InterfaceError, Pool, PostgresError, connect, create_pool
+from pydantic_core import from_json, to_json
 
-from src.data_access_layer import AsyncpgDAL
+from src.cache import INVALIDATOR
+from src.data_access_layer import STATEMENTS, AsyncpgConnection, AsyncpgDAL
 from src.errors import DBConnError
-from src.settings import DBSettings
+from src.metrics import POOL_ACQUIRE_SECONDS, POOL_ACQUIRE_TIMEOUTS, POOL_CONNECTIONS
+from src.settings import LOGGER, DBSettings
+
+SMOOTHING: float = 0.1
+RELISTEN_DELAY: float = 0.5
+RELISTEN_MAX_DELAY: float = 30.0
+
+Isolation = Literal["read_committed", "read_uncommitted", "repeatable_read", "serializable"]
 
 
 @dataclass(kw_only=True)
@@ -23,7 +33,7 @@ class DBManager(ABC):
 
     @abstractmethod
     @asynccontextmanager
-    async def get_conn(self) -> AsyncGenerator[Any]:
+    async def get_conn(self, *, read_only: bool = False, isolation: Isolation | None = None) -> AsyncGenerator[Any]:
         pass
 
     @abstractmethod
@@ -42,26 +52,160 @@ class DBManager(ABC):
 
 class AsyncpgManager(DBManager):
     pool: Pool | None = None
+    replica_pool: Pool | None = None
+    listener: Connection | None = None
+    acquire_latency: float = 0.0
 
     @asynccontextmanager
-    async def get_conn(self) -> AsyncGenerator[Any]:
+    async def get_conn(self, *, read_only: bool = False, isolation: Isolation | None = None) -> AsyncGenerator[Any]:
         assert self.pool is not None
 
+        pool, name = self.pool, "primary"
+        if read_only and self.replica_pool is not None:
+            pool, name = self.replica_pool, "replica"
+        start = monotonic()
         try:
-            async with self.pool.acquire(timeout=self.timeout) as conn, conn.transaction():
+            acquired = await pool.acquire(timeout=self.timeout)
+        except (CancelledError, TimeoutError) as exc:
+            POOL_ACQUIRE_TIMEOUTS.inc(name)
+            raise DBConnError from exc
+
+        POOL_ACQUIRE_SECONDS.observe(latency := monotonic() - start, name)
+        if pool is self.pool:
+            self.acquire_latency += SMOOTHING * (latency - self.acquire_latency)
+        conn = cast("AsyncpgConnection", acquired)
+        try:
+            if read_only:
                 yield conn
+                return
+
+            try:
+                async with conn.transaction(isolation=isolation):
+                    yield conn
+                for callback in conn.after_commit:
+                    await callback()
+            finally:
+                conn.after_commit.clear()
         except CancelledError as exc:
             raise DBConnError from exc
+        finally:
+            await pool.release(acquired)
 
     async def __aenter__(self) -> None:
-        self.pool = await create_pool(
-            f"postgresql://{self.settings.user}:{self.settings.password}@{self.settings.host}/{self.settings.db_name}",
+        self.pool = await self._create_pool(self.settings.host)
+        if self.settings.replica_hosts:
+            self.replica_pool = await self._create_pool(
+                ",".join(self.settings.replica_hosts),
+                "?target_session_attrs=prefer-standby",
+            )
+
+        POOL_CONNECTIONS.collect = self._collect_pools
+
+        self.tasks: set[Task[None]] = set()
+        if self.settings.listen_changes:
+            await self._listen()
+
+    def get_acquire_wait(self) -> float:
+        if self.pool is None or self.pool.get_idle_size() or self.pool.get_size() < self.pool.get_max_size():
+            return 0.0
+
+        return self.acquire_latency
+
+    def _get_dsn(self, hosts: str, params: str = "") -> str:
+        return f"postgresql://{self.settings.user}:{self.settings.password}@{hosts}/{self.settings.db_name}{params}"
+
+    @staticmethod
+    def _get_tables() -> list[str]:
+        return [cls.table for cls in AsyncpgDAL.__subclasses__()]
+
+    def _collect_pools(self) -> dict[tuple[str, ...], float]:
+        values: dict[tuple[str, ...], float] = {}
+        for name, pool in (("primary", self.pool), ("replica", self.replica_pool)):
+            if pool is not None:
+                size, idle = pool.get_size(), pool.get_idle_size()
+                values |= {
+                    (name, "max"): pool.get_max_size(),
+                    (name, "size"): size,
+                    (name, "idle"): idle,
+                    (name, "in_use"): size - idle,
+                }
+        return values
+
+    async def _create_pool(self, hosts: str, params: str = "") -> Pool:
+        return await create_pool(
+            self._get_dsn(hosts, params),
             **self.settings.model_dump(
                 by_alias=True,
-                exclude={"dsn", "timeout", "user", "password", "host", "db_name"},
+                exclude={
+                    "dsn",
+                    "timeout",
+                    "user",
+                    "password",
+                    "host",
+                    "replica_hosts",
+                    "db_name",
+                    "cursor_prefetch",
+                    "listen_changes",
+                    "prepare_statements",
+                },
             ),
+            connection_class=AsyncpgConnection,
+            init=self._init_conn,
         )
 
+    async def _init_conn(self, conn: Connection) -> None:
+        for name in "json", "jsonb":
+            await conn.set_type_codec(
+                name,
+                encoder=lambda value: to_json(value).decode(),
+                decoder=from_json,
+                schema="pg_catalog",
+            )
+        if self.settings.prepare_statements:
+            await STATEMENTS.prepare(cast("AsyncpgConnection", conn))
+
+    async def _listen(self) -> None:
+        listener = await connect(self._get_dsn(self.settings.host), timeout=self.timeout)
+        try:
+            for table in self._get_tables():
+                await listener.add_listener(f"{table}_changed", self._on_change)
+        except BaseException:
+            listener.terminate()
+            raise
+
+        listener.add_termination_listener(self._on_listener_terminated)
+        self.listener = listener
+
+    def _on_change(self, conn: Any, pid: int, channel: str, payload: object) -> None:
+        self._spawn(INVALIDATOR.publish((channel.removesuffix("_changed"),)))
+
+    def _on_listener_terminated(self, conn: Any) -> None:
+        if conn is self.listener:
+            LOGGER.warning("Connection listening to changes is lost, reconnecting.")
+            self._spawn(self._relisten())
+
+    async def _relisten(self) -> None:
+        await INVALIDATOR.publish(self._get_tables())
+
+        delay = RELISTEN_DELAY
+        while True:
+            try:
+                await self._listen()
+            except (OSError, TimeoutError, InterfaceError, PostgresError) as exc:
+                LOGGER.error("Changes are not listened to (%s), retrying in %s seconds.", exc, delay)
+                await sleep(delay)
+                delay = min(delay * 2, RELISTEN_MAX_DELAY)
+            else:
+                break
+
+        # Changes committed while nobody was listening are not notified.
+        await INVALIDATOR.publish(self._get_tables())
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
     async def __aexit__(
         self,
         exc_type: type[BaseException] | None,
@@ -70,9 +214,18 @@ class AsyncpgManager(DBManager):
     ) -> None:
         assert self.pool is not None
 
-        if self.clear:
+        for task in self.tasks:
+            task.cancel()
+        await gather(*self.tasks, return_exceptions=True)
+
+        if self.listener is not None:
+            listener, self.listener = self.listener, None
+            await listener.close()
+
+        if self.clear and (tables := self._get_tables()):
             async with self.get_conn() as conn:
-                await conn.execute(
-                    f"TRUNCATE {', '.join(cls.schema.__name__.lower() for cls in AsyncpgDAL.__subclasses__())}",
-                )
+                await conn.execute(f"TRUNCATE {', '.join(tables)}")
+            await INVALIDATOR.publish(tables)
         await self.pool.close()
+        if self.replica_pool is not None:
+            await self.replica_pool.close()
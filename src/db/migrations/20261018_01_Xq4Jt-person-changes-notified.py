@@ -0,0 +1,28 @@
+"""Person changes notified
+"""
+
+from yoyo import step
+
+__depends__ = {"20250316_01_z93KU-person-table-created"}
+
+steps = [
+    step(
+        """
+        CREATE OR REPLACE FUNCTION notify_table_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify(TG_TABLE_NAME || '_changed', TG_OP);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP FUNCTION IF EXISTS notify_table_changed()",
+    ),
+    step(
+        """
+        CREATE TRIGGER person_changed
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON person
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_table_changed()
+        """,
+        "DROP TRIGGER IF EXISTS person_changed ON person",
+    ),
+]
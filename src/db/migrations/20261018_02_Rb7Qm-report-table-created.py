@@ -0,0 +1,68 @@
+"""Report table created
+"""
+
+from yoyo import step
+
+__depends__ = {"20261018_01_Xq4Jt-person-changes-notified"}
+
+steps = [
+    step(
+        """
+        CREATE TABLE IF NOT EXISTS table_revision (
+            name VARCHAR(63) PRIMARY KEY,
+            revision BIGINT NOT NULL
+        )
+        """,
+        "DROP TABLE IF EXISTS table_revision",
+    ),
+    step(
+        """
+        CREATE OR REPLACE FUNCTION revise_table() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_revision VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (name) DO UPDATE SET revision = table_revision.revision + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP FUNCTION IF EXISTS revise_table()",
+    ),
+    step(
+        """
+        CREATE TRIGGER person_revised
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON person
+        FOR EACH STATEMENT EXECUTE FUNCTION revise_table()
+        """,
+        "DROP TRIGGER IF EXISTS person_revised ON person",
+    ),
+    step(
+        """
+        CREATE TABLE IF NOT EXISTS report (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            status VARCHAR(7) CHECK (status IN ('pending', 'running', 'done', 'failed')) NOT NULL DEFAULT 'pending',
+            progress REAL CHECK (progress BETWEEN 0 AND 1) NOT NULL DEFAULT 0,
+            revision BIGINT NOT NULL,
+            result JSON,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            expires_at TIMESTAMPTZ NOT NULL
+        )
+        """,
+        "DROP TABLE IF EXISTS report",
+    ),
+    step(
+        "CREATE UNIQUE INDEX IF NOT EXISTS report_revision_idx ON report (revision) WHERE status <> 'failed'",
+        "DROP INDEX IF EXISTS report_revision_idx",
+    ),
+    step(
+        "CREATE INDEX IF NOT EXISTS report_expires_at_idx ON report (expires_at)",
+        "DROP INDEX IF EXISTS report_expires_at_idx",
+    ),
+    step(
+        """
+        CREATE TRIGGER report_changed
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON report
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_table_changed()
+        """,
+        "DROP TRIGGER IF EXISTS report_changed ON report",
+    ),
+]
@@ -0,0 +1,76 @@
+"""Person snapshot created
+"""
+
+from yoyo import step
+
+__depends__ = {"20261018_02_Rb7Qm-report-table-created"}
+
+steps = [
+    step(
+        "ALTER TABLE person ADD COLUMN IF NOT EXISTS xid XID8 NOT NULL DEFAULT pg_current_xact_id()",
+        "ALTER TABLE person DROP COLUMN IF EXISTS xid",
+    ),
+    step(
+        "CREATE INDEX IF NOT EXISTS person_xid_idx ON person (xid)",
+        "DROP INDEX IF EXISTS person_xid_idx",
+    ),
+    step(
+        """
+        CREATE OR REPLACE FUNCTION set_row_xid() RETURNS trigger AS $$
+        BEGIN
+            NEW.xid := pg_current_xact_id();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP FUNCTION IF EXISTS set_row_xid()",
+    ),
+    step(
+        """
+        CREATE TRIGGER person_xid_set
+        BEFORE UPDATE ON person
+        FOR EACH ROW EXECUTE FUNCTION set_row_xid()
+        """,
+        "DROP TRIGGER IF EXISTS person_xid_set ON person",
+    ),
+    step(
+        """
+        CREATE TABLE IF NOT EXISTS snapshot (
+            name VARCHAR(63) PRIMARY KEY,
+            min_xid XID8 NOT NULL DEFAULT '0',
+            revision BIGINT NOT NULL DEFAULT 0,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT '-infinity'
+        )
+        """,
+        "DROP TABLE IF EXISTS snapshot",
+    ),
+    step("INSERT INTO snapshot (name) VALUES ('person') ON CONFLICT DO NOTHING"),
+    step(
+        """
+        CREATE TABLE IF NOT EXISTS person_snapshot (
+            id UUID PRIMARY KEY,
+            data TEXT NOT NULL
+        )
+        """,
+        "DROP TABLE IF EXISTS person_snapshot",
+    ),
+    step(
+        """
+        CREATE OR REPLACE FUNCTION reset_snapshot() RETURNS trigger AS $$
+        BEGIN
+            UPDATE snapshot SET min_xid = '0' WHERE name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP FUNCTION IF EXISTS reset_snapshot()",
+    ),
+    step(
+        """
+        CREATE TRIGGER person_snapshot_reset
+        AFTER DELETE OR TRUNCATE ON person
+        FOR EACH STATEMENT EXECUTE FUNCTION reset_snapshot()
+        """,
+        "DROP TRIGGER IF EXISTS person_snapshot_reset ON person",
+    ),
+]
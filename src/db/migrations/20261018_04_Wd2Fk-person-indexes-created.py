@@ -0,0 +1,27 @@
+"""Person indexes created
+"""
+
+from yoyo import step
+
+__depends__ = {"20261018_03_Hn4Vc-person-snapshot-created"}
+__transactional__ = False
+
+# Names are compared in the "C" collation: it makes prefixes index ranges and keeps the order independent of the locale.
+steps = [
+    step(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS person_gender_idx ON person (gender, id)",
+        "DROP INDEX CONCURRENTLY IF EXISTS person_gender_idx",
+    ),
+    step(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS person_birthdate_idx ON person (birthdate, id)",
+        "DROP INDEX CONCURRENTLY IF EXISTS person_birthdate_idx",
+    ),
+    step(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS person_first_name_idx ON person (first_name COLLATE "C", id)',
+        "DROP INDEX CONCURRENTLY IF EXISTS person_first_name_idx",
+    ),
+    step(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS person_last_name_idx ON person (last_name COLLATE "C", id)',
+        "DROP INDEX CONCURRENTLY IF EXISTS person_last_name_idx",
+    ),
+]
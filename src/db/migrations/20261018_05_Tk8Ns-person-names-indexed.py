@@ -0,0 +1,73 @@
+"""Person names indexed
+"""
+
+from yoyo import step
+
+__depends__ = {"20261018_04_Wd2Fk-person-indexes-created"}
+
+# Trigrams are indexed over distinct names rather than persons: a common name would otherwise make every search of it
+# rank all of its persons. Names of deleted persons are kept, and they only never match a person.
+steps = [
+    step("CREATE EXTENSION IF NOT EXISTS pg_trgm", "DROP EXTENSION IF EXISTS pg_trgm"),
+    step(
+        "CREATE TABLE IF NOT EXISTS person_name (name VARCHAR(100) COLLATE \"C\" PRIMARY KEY)",
+        "DROP TABLE IF EXISTS person_name",
+    ),
+    step(
+        "CREATE INDEX IF NOT EXISTS person_name_trgm_idx ON person_name USING GIN (name gin_trgm_ops)",
+        "DROP INDEX IF EXISTS person_name_trgm_idx",
+    ),
+    step(
+        """
+        CREATE OR REPLACE FUNCTION add_person_names() RETURNS trigger AS $$
+        BEGIN
+            -- Names are inserted in one order, so concurrent statements cannot deadlock on them.
+            INSERT INTO person_name
+            SELECT first_name FROM new_person UNION SELECT last_name FROM new_person ORDER BY 1
+            ON CONFLICT DO NOTHING;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP FUNCTION IF EXISTS add_person_names()",
+    ),
+    step(
+        """
+        CREATE TRIGGER person_names_inserted
+        AFTER INSERT ON person REFERENCING NEW TABLE AS new_person
+        FOR EACH STATEMENT EXECUTE FUNCTION add_person_names()
+        """,
+        "DROP TRIGGER IF EXISTS person_names_inserted ON person",
+    ),
+    step(
+        """
+        CREATE TRIGGER person_names_updated
+        AFTER UPDATE ON person REFERENCING NEW TABLE AS new_person
+        FOR EACH STATEMENT EXECUTE FUNCTION add_person_names()
+        """,
+        "DROP TRIGGER IF EXISTS person_names_updated ON person",
+    ),
+    step(
+        """
+        CREATE OR REPLACE FUNCTION clear_person_names() RETURNS trigger AS $$
+        BEGIN
+            TRUNCATE person_name;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP FUNCTION IF EXISTS clear_person_names()",
+    ),
+    step(
+        """
+        CREATE TRIGGER person_names_cleared
+        AFTER TRUNCATE ON person
+        FOR EACH STATEMENT EXECUTE FUNCTION clear_person_names()
+        """,
+        "DROP TRIGGER IF EXISTS person_names_cleared ON person",
+    ),
+    step(
+        "INSERT INTO person_name SELECT first_name FROM person UNION SELECT last_name FROM person "
+        "ON CONFLICT DO NOTHING",
+    ),
+]
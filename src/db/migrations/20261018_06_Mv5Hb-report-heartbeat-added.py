@@ -0,0 +1,13 @@
+"""Report heartbeat added
+"""
+
+from yoyo import step
+
+__depends__ = {"20261018_05_Tk8Ns-person-names-indexed"}
+
+steps = [
+    step(
+        "ALTER TABLE report ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMPTZ NOT NULL DEFAULT now()",
+        "ALTER TABLE report DROP COLUMN IF EXISTS heartbeat_at",
+    ),
+]
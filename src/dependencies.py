@@ -1,26 +1,55 @@
 from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from functools import lru_cache
+from time import monotonic
 from typing import Annotated
 
-from asyncpg import Connection
-from asyncpg.pool import PoolConnectionProxy
 from fastapi import Depends, FastAPI
-
-from src.db.db_manager import AsyncpgManager
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient, Limits
+
+from src.admission import AdmissionController
+from src.cache import INVALIDATOR, CacheBackend, MemoryCacheBackend
+from src.compression import CODECS, CompressionCache
+from src.data_access_layer import AsyncpgUnitOfWork
+from src.db.db_manager import AsyncpgManager, Isolation
+from src.executors import ProcessPool, TaskRunner
 from src.settings import (
+    LOGGER,
+    AdmissionSettings,
     APISettings,
+    CacheSettings,
     CompressionSettings,
     CORSSettings,
     DBSettings,
     DocsSettings,
+    IngestSettings,
+    ProcessPoolSettings,
+    ReportJobSettings,
+    ReportSnapshotSettings,
+    SearchSettings,
     TrustedHostsSettings,
 )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
-    async with get_asyncpg_manager():
+    start = monotonic()
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(get_asyncpg_manager())
+        await stack.enter_async_context(get_task_runner())
+        await stack.enter_async_context(get_admission_controller())
+        stack.push_async_callback(close_http_session)
+        if (process_pool := get_process_pool()) is not None:
+            await stack.enter_async_context(process_pool)
+
+        if app.openapi_url is not None:
+            get_compression_cache().warm_up(
+                bytes(JSONResponse(app.openapi()).body),
+                get_compression_settings().codecs or CODECS,
+            )
+
+        LOGGER.info("Application is warmed up in %.3f s.", monotonic() - start)
         yield
 
 
@@ -29,6 +58,23 @@ def get_api_settings() -> APISettings:
     return APISettings()
 
 
+@lru_cache
+def get_http_session() -> AsyncClient:
+    return AsyncClient(
+        limits=Limits(
+            **get_api_settings().model_dump(
+                include={"max_connections", "max_keepalive_connections", "keepalive_expiry"},
+            ),
+        ),
+    )
+
+
+async def close_http_session() -> None:
+    await get_http_session().aclose()
+    # The next lifespan of the application gets a new session, since a closed one cannot be opened again.
+    get_http_session.cache_clear()
+
+
 @lru_cache
 def get_db_settings() -> DBSettings:
     return DBSettings()
@@ -49,6 +95,68 @@ def get_compression_settings() -> CompressionSettings:
     return CompressionSettings()
 
 
+@lru_cache
+def get_compression_cache() -> CompressionCache:
+    return CompressionCache(size=get_compression_settings().cache_size)
+
+
+@lru_cache
+def get_cache_settings() -> CacheSettings:
+    return CacheSettings()
+
+
+@lru_cache
+def get_response_cache() -> CacheBackend:
+    backend = MemoryCacheBackend(
+        size=get_cache_settings().size,
+        lag=get_cache_settings().replica_lag if get_db_settings().replica_hosts else 0.0,
+    )
+    INVALIDATOR.subscribe(backend.invalidate)
+
+    return backend
+
+
+@lru_cache
+def get_ingest_settings() -> IngestSettings:
+    return IngestSettings()
+
+
+@lru_cache
+def get_search_settings() -> SearchSettings:
+    return SearchSettings()
+
+
+@lru_cache
+def get_report_snapshot_settings() -> ReportSnapshotSettings:
+    return ReportSnapshotSettings()
+
+
+@lru_cache
+def get_report_job_settings() -> ReportJobSettings:
+    return ReportJobSettings()
+
+
+@lru_cache
+def get_task_runner() -> TaskRunner:
+    return TaskRunner(concurrency=get_report_job_settings().concurrency)
+
+
+TaskRunnerDep = Annotated[TaskRunner, Depends(get_task_runner)]
+
+
+@lru_cache
+def get_process_pool_settings() -> ProcessPoolSettings:
+    return ProcessPoolSettings()
+
+
+@lru_cache
+def get_process_pool() -> ProcessPool | None:
+    if not get_process_pool_settings().size:
+        return None
+
+    return ProcessPool(size=get_process_pool_settings().size)
+
+
 @lru_cache
 def get_docs_settings() -> DocsSettings:
     return DocsSettings()
@@ -59,12 +167,50 @@ def get_asyncpg_manager() -> AsyncpgManager:
     return AsyncpgManager(settings=get_db_settings())
 
 
+@lru_cache
+def get_admission_settings() -> AdmissionSettings:
+    return AdmissionSettings()
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    return AdmissionController(
+        limits=get_admission_settings().limits,
+        budget=get_admission_settings().budget,
+        capacity=get_db_settings().pool_max_size,
+        get_pool_wait=get_asyncpg_manager().get_acquire_wait,
+    )
+
+
 AsyncpgManagerDep = Annotated[AsyncpgManager, Depends(get_asyncpg_manager)]
 
 
-async def get_conn(db_manager: AsyncpgManagerDep) -> AsyncGenerator[PoolConnectionProxy]:
-    async with db_manager.get_conn() as conn:
-        yield conn
+@asynccontextmanager
+async def open_unit_of_work(
+    db_manager: AsyncpgManager,
+    *,
+    read_only: bool = False,
+    isolation: Isolation | None = None,
+) -> AsyncGenerator[AsyncpgUnitOfWork]:
+    async with db_manager.get_conn(read_only=read_only, isolation=isolation) as conn:
+        unit_of_work = AsyncpgUnitOfWork(conn=conn)
+        try:
+            yield unit_of_work
+        finally:
+            unit_of_work.close()
+
+
+async def get_unit_of_work(db_manager: AsyncpgManagerDep) -> AsyncGenerator[AsyncpgUnitOfWork]:
+    async with open_unit_of_work(db_manager) as unit_of_work:
+        yield unit_of_work
+
+
+UnitOfWorkDep = Annotated[AsyncpgUnitOfWork, Depends(get_unit_of_work)]
+
+
+async def get_read_unit_of_work(db_manager: AsyncpgManagerDep) -> AsyncGenerator[AsyncpgUnitOfWork]:
+    async with open_unit_of_work(db_manager, read_only=True) as unit_of_work:
+        yield unit_of_work
 
 
-ConnDep = Annotated[Connection, Depends(get_conn)]
+ReadUnitOfWorkDep = Annotated[AsyncpgUnitOfWork, Depends(get_read_unit_of_work)]
@@ -15,7 +15,14 @@ validation_response: dict[int, dict[str, str | type[list[Error]]]] = {
 
 db_conn_response: dict[int, dict[str, str | type[Error]]] = {
     status.HTTP_503_SERVICE_UNAVAILABLE: {
-        "description": "Failed to establish the connection to the database.",
+        "description": "Failed to establish the connection to the database or the service is overloaded.",
+        "model": Error,
+    },
+}
+
+db_timeout_response: dict[int, dict[str, str | type[Error]]] = {
+    status.HTTP_504_GATEWAY_TIMEOUT: {
+        "description": "The database did not answer in time.",
         "model": Error,
     },
 }
@@ -27,12 +34,57 @@ unexpected_exception_response: dict[int, dict[str, str | type[Error]]] = {
     },
 }
 
+not_found_response: dict[int, dict[str, str | type[Error]]] = {
+    status.HTTP_404_NOT_FOUND: {
+        "description": "Requested resource does not exist or has expired.",
+        "model": Error,
+    },
+}
+
+payload_too_large_response: dict[int, dict[str, str | type[list[Error]]]] = {
+    status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {
+        "description": "Input exceeds size or rows limits.",
+        "model": list[Error],
+    },
+}
+
 
 class DBConnError(ConnectionError):
     def __init__(self, msg: str = "Internal error.") -> None:
         super().__init__(msg)
 
 
+class OverloadedError(ConnectionError):
+    def __init__(self, msg: str = "Service is overloaded.", retry_after: int = 1) -> None:
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+
+class DBTimeoutError(TimeoutError):
+    def __init__(self, msg: str = "Query took too long.") -> None:
+        super().__init__(msg)
+
+
+class CursorError(ValueError):
+    def __init__(self, msg: str = "Invalid cursor.") -> None:
+        super().__init__(msg)
+
+
+class NotFoundError(LookupError):
+    def __init__(self, msg: str = "Resource not found.") -> None:
+        super().__init__(msg)
+
+
+class PayloadError(ValueError):
+    def __init__(self, msg: str = "Invalid payload.") -> None:
+        super().__init__(msg)
+
+
+class PayloadTooLargeError(ValueError):
+    def __init__(self, msg: str = "Payload is too large.") -> None:
+        super().__init__(msg)
+
+
 def handle(errors: list[dict[str, str | list[str]]], status_code: int) -> JSONResponse:
     return JSONResponse(
         [Error(**content).model_dump(mode="json", exclude_none=True) for content in errors],
@@ -58,6 +110,47 @@ async def validation_handler(
     )
 
 
+async def cursor_handler(request: Request, exc: CursorError) -> JSONResponse:
+    LOGGER.debug(exc)
+
+    return handle(
+        [
+            {
+                "reason": exc.args[0],
+                "ways_to_solve": ["Pass the «next» value of the previous page.", "Start from the first page."],
+            },
+        ],
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+    )
+
+
+async def not_found_handler(request: Request, exc: NotFoundError) -> JSONResponse:
+    LOGGER.debug(exc)
+
+    return handle(
+        [{"reason": exc.args[0], "ways_to_solve": ["Check the identifier.", "Create the resource again."]}],
+        status.HTTP_404_NOT_FOUND,
+    )
+
+
+async def payload_handler(request: Request, exc: PayloadError) -> JSONResponse:
+    LOGGER.debug(exc)
+
+    return handle(
+        [{"reason": exc.args[0], "ways_to_solve": ["Correct your input."]}],
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+    )
+
+
+async def payload_too_large_handler(request: Request, exc: PayloadTooLargeError) -> JSONResponse:
+    LOGGER.debug(exc)
+
+    return handle(
+        [{"reason": exc.args[0], "ways_to_solve": ["Split your input into smaller parts."]}],
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    )
+
+
 async def db_conn_handler(request: Request, exc: DBConnError) -> JSONResponse:
     LOGGER.critical(exc)
 
@@ -67,6 +160,26 @@ async def db_conn_handler(request: Request, exc: DBConnError) -> JSONResponse:
     )
 
 
+async def overloaded_handler(request: Request, exc: OverloadedError) -> JSONResponse:
+    LOGGER.warning(exc)
+
+    response = handle(
+        [{"reason": exc.args[0], "ways_to_solve": [f"Try again in {exc.retry_after} s."]}],
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response.headers["Retry-After"] = str(exc.retry_after)
+    return response
+
+
+async def db_timeout_handler(request: Request, exc: DBTimeoutError) -> JSONResponse:
+    LOGGER.warning(exc)
+
+    return handle(
+        [{"reason": exc.args[0], "ways_to_solve": ["Refine your input.", "Try later."]}],
+        status.HTTP_504_GATEWAY_TIMEOUT,
+    )
+
+
 async def external_api_handler(request: Request, exc: ExternalAPIError) -> JSONResponse:
     LOGGER.exception(exc)
 
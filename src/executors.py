@@ -0,0 +1,106 @@
+from asyncio import Semaphore, Task, create_task, gather, get_running_loop, to_thread
+from collections.abc import Callable, Coroutine, Generator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from types import TracebackType
+from typing import Any
+
+from src.settings import LOGGER
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class ProcessPool:
+    size: int
+
+    executor: ProcessPoolExecutor | None = None
+
+    async def run[T](self, func: Callable[..., T], *args: Any) -> T:
+        assert self.executor is not None
+
+        return await get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def __aenter__(self) -> None:
+        # Forking a process with running threads and an event loop is unsafe, so workers are spawned.
+        self.executor = ProcessPoolExecutor(self.size, mp_context=get_context("spawn"))
+        await gather(*(self.run(int) for _ in range(self.size)))
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        assert self.executor is not None
+
+        # Waiting for the processes to exit would block the event loop.
+        await to_thread(self.executor.shutdown, cancel_futures=True)
+        self.executor = None
+
+
+@contextmanager
+def share(data: bytes) -> Generator[str]:
+    # Processes attach to the data by its name, so it is copied once instead of being pickled to each of them.
+    memory = SharedMemory(create=True, size=len(data))
+    assert memory.buf is not None
+
+    try:
+        memory.buf[: len(data)] = data
+        yield memory.name
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def read_shared(name: str, size: int) -> bytes:
+    # The creator unlinks the memory, so it is not tracked by the processes that only read it.
+    memory = SharedMemory(name=name, track=False)
+    assert memory.buf is not None
+
+    try:
+        return bytes(memory.buf[:size])
+    finally:
+        memory.close()
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class TaskRunner:
+    concurrency: int
+
+    semaphore: Semaphore | None = None
+    tasks: set[Task[None]] = field(default_factory=set)
+
+    def submit(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = create_task(self._run(coro))
+        self.tasks.add(task)
+        task.add_done_callback(self._on_done)
+
+    async def _run(self, coro: Coroutine[Any, Any, None]) -> None:
+        assert self.semaphore is not None
+
+        try:
+            async with self.semaphore:
+                await coro
+        finally:
+            # Closes coroutines cancelled before they started.
+            coro.close()
+
+    def _on_done(self, task: Task[None]) -> None:
+        self.tasks.discard(task)
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            LOGGER.error("Background task has failed.", exc_info=exc)
+
+    async def __aenter__(self) -> None:
+        self.semaphore = Semaphore(self.concurrency)
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await gather(*self.tasks, return_exceptions=True)
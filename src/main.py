@@ -1,54 +1,119 @@
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from src.dependencies import (
+    get_admission_controller,
+    get_cache_settings,
+    get_compression_cache,
     get_compression_settings,
     get_cors_settings,
     get_docs_settings,
+    get_response_cache,
     get_trusted_hosts_settings,
     lifespan,
 )
 from src.errors import (
+    CursorError,
     DBConnError,
+    DBTimeoutError,
+    NotFoundError,
+    OverloadedError,
+    PayloadError,
+    PayloadTooLargeError,
+    cursor_handler,
     db_conn_handler,
+    db_timeout_handler,
     external_api_handler,
+    not_found_handler,
+    overloaded_handler,
+    payload_handler,
+    payload_too_large_handler,
     route_not_found_handler,
     unexpected_exception_handler,
     validation_handler,
 )
-from src.middlewares import VersionMiddleware
+from src.metrics import router as metrics_router
+from src.middlewares import (
+    AdmissionMiddleware,
+    CacheMiddleware,
+    CompressionMiddleware,
+    MetricsMiddleware,
+    VersionMiddleware,
+)
 from src.persons.errors import ExternalAPIError
 from src.persons.router import router as person_router
 from src.reports.router import router as report_router
 
-app: FastAPI = FastAPI(
-    **get_docs_settings().model_dump(by_alias=True, exclude_none=True),
-    lifespan=lifespan,
-)
 
-for middleware, settings in (
-    (TrustedHostMiddleware, get_trusted_hosts_settings()),
-    (CORSMiddleware, get_cors_settings()),
-    (GZipMiddleware, get_compression_settings()),
-):
+def create_app() -> FastAPI:
+    app = FastAPI(
+        **get_docs_settings().model_dump(by_alias=True, exclude_none=True),
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=get_admission_controller(),
+        routes={
+            "GET /api/reports/jobs": "read",
+            "POST /api/reports/jobs": "write",
+            "GET /api/reports": "report",
+            "GET /api/persons": "read",
+            "POST /api/persons": "write",
+        },
+    )
+
     app.add_middleware(
-        middleware,
-        **settings.model_dump(by_alias=True, exclude_none=True),
+        CacheMiddleware,
+        backend=get_response_cache(),
+        routes={
+            "/api/persons": ("person",),
+            "/api/reports/jobs": ("report",),
+            "/api/reports": ("person",),
+            **({app.openapi_url: ()} if app.openapi_url is not None else {}),
+        },
+        ttl=get_cache_settings().ttl,
     )
 
-app.add_middleware(VersionMiddleware, version=get_docs_settings().version)
+    for middleware, settings in (
+        (TrustedHostMiddleware, get_trusted_hosts_settings()),
+        (CORSMiddleware, get_cors_settings()),
+    ):
+        app.add_middleware(
+            middleware,
+            **settings.model_dump(by_alias=True, exclude_none=True),
+        )
+
+    app.add_middleware(
+        CompressionMiddleware,
+        cache=get_compression_cache(),
+        **get_compression_settings().model_dump(by_alias=True, exclude_none=True, exclude={"cache_size"}),
+    )
+
+    app.add_middleware(VersionMiddleware, version=get_docs_settings().version)
+
+    app.add_middleware(MetricsMiddleware, routes=app.routes)
+
+    for exc, handler in (
+        (RequestValidationError, validation_handler),
+        (404, route_not_found_handler),
+        (CursorError, cursor_handler),
+        (NotFoundError, not_found_handler),
+        (PayloadError, payload_handler),
+        (PayloadTooLargeError, payload_too_large_handler),
+        (DBConnError, db_conn_handler),
+        (OverloadedError, overloaded_handler),
+        (DBTimeoutError, db_timeout_handler),
+        (ExternalAPIError, external_api_handler),
+        (Exception, unexpected_exception_handler),
+    ):
+        app.add_exception_handler(exc, handler)
+
+    for router in person_router, report_router:
+        app.include_router(router, prefix="/api")
 
-for exc, handler in (
-    (RequestValidationError, validation_handler),
-    (404, route_not_found_handler),
-    (DBConnError, db_conn_handler),
-    (ExternalAPIError, external_api_handler),
-    (Exception, unexpected_exception_handler),
-):
-    app.add_exception_handler(exc, handler)
+    app.include_router(metrics_router)
 
-for router in person_router, report_router:
-    app.include_router(router, prefix="/api")
+    return app
@@ -0,0 +1,211 @@
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import ClassVar
+
+from fastapi import status
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRouter
+
+LATENCY_BUCKETS: tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS: tuple[float, ...] = tuple(float(4**power) for power in range(3, 12))
+
+ESCAPES: dict[int, str] = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+Labels = tuple[str, ...]
+
+
+def _format(name: str, labels: dict[str, str], value: float) -> str:
+    if not labels:
+        return f"{name} {value}"
+
+    pairs = ",".join(f'{key}="{label.translate(ESCAPES)}"' for key, label in labels.items())
+    return f"{name}{{{pairs}}} {value}"
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class Metric:
+    type: ClassVar[str] = "untyped"
+
+    name: str
+    description: str
+    labels: Labels = ()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self.samples()
+
+    def samples(self) -> Iterator[str]:
+        yield from ()
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class Counter(Metric):
+    type: ClassVar[str] = "counter"
+
+    values: dict[Labels, float] = field(default_factory=dict)
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + value
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield _format(self.name, dict(zip(self.labels, labels, strict=True)), value)
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class Gauge(Metric):
+    type: ClassVar[str] = "gauge"
+
+    values: dict[Labels, float] = field(default_factory=dict)
+    collect: Callable[[], dict[Labels, float]] | None = None
+
+    def add(self, *labels: str, value: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + value
+
+    def samples(self) -> Iterator[str]:
+        values = self.values if self.collect is None else self.collect()
+        for labels, value in values.items():
+            yield _format(self.name, dict(zip(self.labels, labels, strict=True)), value)
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class Histogram(Metric):
+    type: ClassVar[str] = "histogram"
+
+    buckets: tuple[float, ...] = LATENCY_BUCKETS
+    counts: dict[Labels, list[int]] = field(default_factory=dict)
+    sums: dict[Labels, float] = field(default_factory=dict)
+
+    def observe(self, value: float, *labels: str) -> None:
+        if (counts := self.counts.get(labels)) is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+            self.sums[labels] = 0.0
+
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def samples(self) -> Iterator[str]:
+        for labels, counts in self.counts.items():
+            named = dict(zip(self.labels, labels, strict=True))
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+                total += count
+                yield _format(f"{self.name}_bucket", named | {"le": str(bound)}, total)
+            yield _format(f"{self.name}_sum", named, self.sums[labels])
+            yield _format(f"{self.name}_count", named, total)
+
+
+@dataclass(kw_only=True, slots=True)
+class Registry:
+    metrics: list[Metric] = field(default_factory=list)
+
+    def register[MetricT: Metric](self, metric: MetricT) -> MetricT:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+
+REGISTRY: Registry = Registry()
+
+POOL_CONNECTIONS: Gauge = REGISTRY.register(
+    Gauge(
+        name="db_pool_connections",
+        description="Connections of the database pool by state.",
+        labels=("pool", "state"),
+    ),
+)
+POOL_ACQUIRE_SECONDS: Histogram = REGISTRY.register(
+    Histogram(
+        name="db_pool_acquire_seconds",
+        description="Time spent waiting for a connection from the pool.",
+        labels=("pool",),
+    ),
+)
+POOL_ACQUIRE_TIMEOUTS: Counter = REGISTRY.register(
+    Counter(
+        name="db_pool_acquire_timeouts_total",
+        description="Connections that could not be acquired in time.",
+        labels=("pool",),
+    ),
+)
+QUERY_SECONDS: Histogram = REGISTRY.register(
+    Histogram(
+        name="db_query_seconds",
+        description="Latency of DAL queries.",
+        labels=("dal", "method"),
+    ),
+)
+UPSTREAM_SECONDS: Histogram = REGISTRY.register(
+    Histogram(
+        name="upstream_request_seconds",
+        description="Latency of requests to external APIs.",
+        labels=("host", "method"),
+    ),
+)
+UPSTREAM_ERRORS: Counter = REGISTRY.register(
+    Counter(
+        name="upstream_errors_total",
+        description="Failed requests to external APIs by reason.",
+        labels=("host", "reason"),
+    ),
+)
+REQUESTS_IN_FLIGHT: Gauge = REGISTRY.register(
+    Gauge(
+        name="http_requests_in_flight",
+        description="Requests being processed.",
+    ),
+)
+RESPONSE_BYTES: Histogram = REGISTRY.register(
+    Histogram(
+        name="http_response_bytes",
+        description="Size of response bodies by route.",
+        labels=("route", "method"),
+        buckets=SIZE_BUCKETS,
+    ),
+)
+CACHE_LOOKUPS: Counter = REGISTRY.register(
+    Counter(
+        name="cache_lookups_total",
+        description="Lookups of in-process caches by result.",
+        labels=("cache", "result"),
+    ),
+)
+ADMISSION_DECISIONS: Counter = REGISTRY.register(
+    Counter(
+        name="admission_decisions_total",
+        description="Requests admitted to or shed in front of the database by route class.",
+        labels=("route_class", "decision"),
+    ),
+)
+ADMISSION_WAIT_SECONDS: Histogram = REGISTRY.register(
+    Histogram(
+        name="admission_wait_seconds",
+        description="Time admitted requests spent queued for a slot of their route class.",
+        labels=("route_class",),
+    ),
+)
+ADMISSION_REQUESTS: Gauge = REGISTRY.register(
+    Gauge(
+        name="admission_requests",
+        description="Slots of route classes by state.",
+        labels=("route_class", "state"),
+    ),
+)
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    summary="Metrics retrieval.",
+    response_description="Metrics are successfully retrieved in the Prometheus text format.",
+    response_class=PlainTextResponse,
+)
+async def get_metrics() -> PlainTextResponse:
+    """Renders all registered metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -1,20 +1,320 @@
-from fastapi import Request, Response
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from time import monotonic
+from urllib.parse import parse_qsl, urlencode
+
 from pydantic_extra_types.semantic_version import SemanticVersion
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.types import ASGIApp
+from starlette import status
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.admission import AdmissionController
+from src.cache import CacheBackend, CachedResponse
+from src.compression import CODECS, Codec, CodecName, CompressionCache, Compressor, negotiate
+from src.errors import OverloadedError, overloaded_handler
+from src.metrics import REQUESTS_IN_FLIGHT, RESPONSE_BYTES
+
+
+class HeadersMiddleware:
+    def __init__(self, app: ASGIApp, headers: Mapping[str, str]) -> None:
+        self.app = app
+        self.headers: list[tuple[bytes, bytes]] = [
+            (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *self.headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 
-class VersionMiddleware(BaseHTTPMiddleware):
+class VersionMiddleware(HeadersMiddleware):
     def __init__(self, app: ASGIApp, version: SemanticVersion) -> None:
-        super().__init__(app)
-        self.version: SemanticVersion = version
+        super().__init__(app, {"X-Version": str(version)})
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute]) -> None:
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        size = 0
+
+        async def send_with_size(message: Message) -> None:
+            nonlocal size
+            if message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.add()
+        try:
+            await self.app(scope, receive, send_with_size)
+        finally:
+            REQUESTS_IN_FLIGHT.add(value=-1)
+            RESPONSE_BYTES.observe(size, self.match(scope), scope["method"])
 
-    async def dispatch(
+    def match(self, scope: Scope) -> str:
+        if (route := scope.get("route")) is not None:
+            return route.path
+
+        for route in self.routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return getattr(route, "path", "unmatched")
+        return "unmatched"
+
+
+class CompressionMiddleware:
+    def __init__(
         self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
-        response = await call_next(request)
-        response.headers["X-Version"] = str(self.version)
+        app: ASGIApp,
+        cache: CompressionCache,
+        minimum_size: int = 500,
+        codecs: Sequence[CodecName] = ("br", "zstd", "gzip"),
+        large_size: int = 1024 * 1024,
+    ) -> None:
+        self.app = app
+        self.cache = cache
+        self.minimum_size = minimum_size
+        self.codecs = tuple(codecs)
+        self.large_size = large_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codec = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                if (codec := negotiate(value.decode("latin-1"), self.codecs)) is not None:
+                    scope["headers"] = [
+                        (name, self.strip_etags(value) if name == b"if-none-match" else value)
+                        for name, value in scope["headers"]
+                    ]
+                break
+
+        await self.app(scope, receive, CompressionResponder(middleware=self, codec=codec, send=send))
+
+    @staticmethod
+    def strip_etags(value: bytes) -> bytes:
+        for name in CODECS:
+            value = value.replace(f'-{name}"'.encode(), b'"')
+        return value
+
+
+@dataclass(kw_only=True, slots=True)
+class CompressionResponder:
+    middleware: CompressionMiddleware
+    codec: Codec | None
+    send: Send
+
+    start: Message | None = None
+    compressor: Compressor | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+        elif message["type"] != "http.response.body":
+            await self.send(message)
+        elif self.start is not None:
+            start, self.start = self.start, None
+            await self.begin(start, message)
+        elif self.compressor is None:
+            await self.send(message)
+        else:
+            more_body = message.get("more_body", False)
+            body = self.compressor.compress(message.get("body", b""))
+            if not more_body:
+                body += self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def begin(self, start: Message, message: Message) -> None:
+        headers = MutableHeaders(raw=list(start.get("headers", ())))
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if start["status"] == status.HTTP_304_NOT_MODIFIED:
+            self.tag_etag(headers)
+            await self.send({**start, "headers": headers.raw})
+            await self.send(message)
+            return
+
+        if (
+            "content-encoding" in headers
+            or headers.get("content-type", "").startswith("text/event-stream")
+            or (not more_body and len(body) < self.middleware.minimum_size)
+        ):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        # Shared caches must not serve one encoding of the response to a client that negotiated another one.
+        headers.add_vary_header("Accept-Encoding")
+        if self.codec is None:
+            await self.send({**start, "headers": headers.raw})
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.codec.name
+        self.tag_etag(headers)
+        if more_body:
+            del headers["Content-Length"]
+            self.compressor = self.codec.compressor(self.codec.fast)
+            body = self.compressor.compress(body)
+        else:
+            level = self.codec.default if len(body) < self.middleware.large_size else self.codec.fast
+            # Only responses cached upstream repeat, while compressed copies of unique ones would evict them.
+            if "etag" in headers:
+                body = self.middleware.cache.compress(self.codec, body, level)
+            else:
+                body = self.codec.compress(body, level)
+            headers["Content-Length"] = str(len(body))
+
+        await self.send({**start, "headers": headers.raw})
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def tag_etag(self, headers: MutableHeaders) -> None:
+        if self.codec is not None and (etag := headers.get("ETag")) is not None and etag.endswith('"'):
+            headers["ETag"] = f'{etag[:-1]}-{self.codec.name}"'
+
+
+class CacheMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: CacheBackend,
+        routes: Mapping[str, Iterable[str]],
+        ttl: float = 60.0,
+    ) -> None:
+        self.app = app
+        self.backend = backend
+        self.routes = {prefix: frozenset(tags) for prefix, tags in routes.items()}
+        self.ttl = ttl
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or (tags := self.match(scope["path"])) is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"{scope['path']}?{urlencode(sorted(parse_qsl(scope['query_string'].decode('latin-1'))))}"
+        etags = {
+            etag.strip().removeprefix(b"W/")
+            for name, value in scope["headers"]
+            if name == b"if-none-match"
+            for etag in value.split(b",")
+        }
+
+        if (response := await self.backend.get(key)) is not None:
+            await self.respond(send, response, etags)
+            return
+
+        await self.app(
+            scope,
+            receive,
+            CacheResponder(middleware=self, key=key, tags=tags, etags=etags, send=send, created_at=monotonic()),
+        )
+
+    def match(self, path: str) -> frozenset[str] | None:
+        for prefix, tags in self.routes.items():
+            if path == prefix or path.startswith(f"{prefix}/"):
+                return tags
+        return None
+
+    @staticmethod
+    async def respond(send: Send, response: CachedResponse, etags: set[bytes]) -> None:
+        if response.etag in etags or b"*" in etags:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": status.HTTP_304_NOT_MODIFIED,
+                    "headers": [(b"etag", response.etag)],
+                },
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send({"type": "http.response.start", "status": status.HTTP_200_OK, "headers": response.headers})
+        await send({"type": "http.response.body", "body": response.body})
+
+
+@dataclass(kw_only=True, slots=True)
+class CacheResponder:
+    middleware: CacheMiddleware
+    key: str
+    tags: frozenset[str]
+    etags: set[bytes] = field(default_factory=set)
+    send: Send
+    created_at: float
+
+    start: Message | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start" and message["status"] == status.HTTP_200_OK:
+            self.start = message
+        elif message["type"] != "http.response.body" or self.start is None:
+            await self.send(message)
+        elif message.get("more_body", False):
+            start, self.start = self.start, None
+            await self.send(start)
+            await self.send(message)
+        else:
+            start, self.start = self.start, None
+            body: bytes = message.get("body", b"")
+            etag = CachedResponse.make_etag(body)
+            response = CachedResponse(
+                headers=[*start.get("headers", ()), (b"etag", etag)],
+                body=body,
+                etag=etag,
+                tags=self.tags,
+                created_at=self.created_at,
+                expires_at=monotonic() + self.middleware.ttl,
+            )
+
+            await self.middleware.backend.set(self.key, response)
+            await self.middleware.respond(self.send, response, self.etags)
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp, controller: AdmissionController, routes: Mapping[str, str]) -> None:
+        self.app = app
+        self.controller = controller
+        self.routes = [
+            (*route.split(" ", 1), name) for route, name in routes.items() if name in controller.route_classes
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (name := self.match(scope["method"], scope["path"])) is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            admitted_at = await self.controller.acquire(name)
+        except OverloadedError as exc:
+            response = await overloaded_handler(Request(scope), exc)
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name, admitted_at)
 
-        return response
+    def match(self, method: str, path: str) -> str | None:
+        for route_method, prefix, name in self.routes:
+            if method == route_method and (path == prefix or path.startswith(f"{prefix}/")):
+                return name
+        return None
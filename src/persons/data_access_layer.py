@@ -1,9 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import cast
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime
+from sys import maxunicode
+from typing import Any, ClassVar, cast
+from uuid import uuid4
 
-from src.data_access_layer import AsyncpgDAL
-from src.persons.schemas import Person, PersonCreate
-from src.schemas import Schema, from_dict
+from asyncpg import QueryCanceledError, Record, SerializationError
+
+from src.data_access_layer import AsyncpgDAL, invalidates
+from src.errors import DBTimeoutError
+from src.persons.schemas import Person, PersonCreate, PersonFilter, PersonSort, PersonStatistics
+from src.schemas import Page, Schema, from_dict, from_dicts
+
+SURROGATES_START: int = 0xD800
+SURROGATES_END: int = 0xE000
 
 
 class PersonDAL(ABC):
@@ -11,25 +22,306 @@ class PersonDAL(ABC):
     async def read_all(self) -> list[Person]:
         pass
 
+    @abstractmethod
+    def stream_all(self, prefetch: int) -> AsyncIterator[list[Person]]:
+        pass
+
+    @abstractmethod
+    async def read_statistics(self, age_group_size: int) -> PersonStatistics:
+        pass
+
+    @abstractmethod
+    async def read_count(self) -> int:
+        pass
+
+    @abstractmethod
+    async def read_revision(self) -> int:
+        pass
+
+    @abstractmethod
+    async def read_snapshot(self, prefetch: int) -> tuple[datetime, list[str]]:
+        pass
+
+    @abstractmethod
+    async def refresh_snapshot(self, staleness: float) -> None:
+        pass
+
+    @abstractmethod
+    async def read_page(
+        self,
+        limit: int,
+        after: str | None = None,
+        filters: PersonFilter | None = None,
+        sort: PersonSort = "id",
+    ) -> Page[Person]:
+        pass
+
+    @abstractmethod
+    async def search(self, query: str, limit: int, statement_timeout: float) -> list[Person]:
+        pass
+
     @abstractmethod
     @from_dict()
     @Schema.to_tuple
     async def write(self, person: PersonCreate) -> Person:
         pass
 
+    @abstractmethod
+    async def write_many(self, persons: Sequence[PersonCreate]) -> list[Person]:
+        pass
+
 
 class PersonAsyncpgDAL(PersonDAL, AsyncpgDAL):
     schema = Person
+    groupings: ClassVar[dict[int, tuple[str, str]]] = {
+        0b011: ("genders", "gender"),
+        0b101: ("age_groups", "age_group"),
+        0b110: ("birth_years", "birth_year"),
+    }
+    # Each sort key is backed by a btree index ending with the primary key, which makes the order unique for cursors.
+    sorts: ClassVar[dict[str, tuple[str, str]]] = {
+        "id": ("id", "id"),
+        "firstName": ("first_name", 'first_name COLLATE "C"'),
+        "lastName": ("last_name", 'last_name COLLATE "C"'),
+        "birthdate": ("birthdate", "birthdate"),
+    }
+
+    @classmethod
+    def build_statements(cls, table: str, keys: str) -> dict[str, str]:
+        # Rows of the snapshot are rendered as the API serializes them, so a report is assembled without parsing.
+        fields = cls.schema.model_fields
+        template = ",".join(f'"{field.alias or name}":%s' for name, field in fields.items())
+        values = ", ".join(f"to_json({name})" for name in fields)
+        columns = ", ".join(fields)
+
+        return super().build_statements(table, keys) | {
+            "read_statistics": (
+                "SELECT GROUPING(gender, age_group, birth_year) AS grouping, gender, age_group, birth_year, "  # noqa: S608
+                "count(*) AS count, min(age) AS min_age, max(age) AS max_age, "
+                "percentile_cont(0.5) WITHIN GROUP (ORDER BY age) AS median_age "
+                "FROM ("
+                "SELECT gender, age, age / $1 * $1 AS age_group, EXTRACT(YEAR FROM birthdate)::int AS birth_year "
+                f"FROM (SELECT *, EXTRACT(YEAR FROM age(birthdate))::int AS age FROM {table})"
+                ") GROUP BY GROUPING SETS ((gender), (age_group), (birth_year), ())"
+            ),
+            "read_count": f"SELECT count(*) FROM {table}",  # noqa: S608
+            "read_revision": "SELECT coalesce(max(revision), 0) FROM table_revision WHERE name = $1",
+            "read_snapshot_time": "SELECT created_at FROM snapshot WHERE name = $1",
+            "read_snapshot": f"SELECT data FROM {table}_snapshot",  # noqa: S608
+            "lock_snapshot": "SELECT pg_try_advisory_xact_lock(hashtext('snapshot'), hashtext($1))",
+            "read_snapshot_state": (
+                "SELECT min_xid, snapshot.revision <> coalesce(table_revision.revision, 0) AS changed, "
+                "created_at > now() - make_interval(secs => $2) AS fresh "
+                "FROM snapshot LEFT JOIN table_revision USING (name) WHERE name = $1"
+            ),
+            "clear_snapshot": f"TRUNCATE {table}_snapshot",
+            "refresh_snapshot": (
+                f"INSERT INTO {table}_snapshot SELECT id, format('{{{template}}}', {values}) "  # noqa: S608
+                f"FROM {table} WHERE xid >= $1 ON CONFLICT (id) DO UPDATE SET data = EXCLUDED.data"
+            ),
+            "update_snapshot": (
+                "UPDATE snapshot SET min_xid = pg_snapshot_xmin(pg_current_snapshot()), created_at = now(), "
+                "revision = coalesce((SELECT revision FROM table_revision WHERE name = $1), 0) WHERE name = $1"
+            ),
+            "configure_search": (
+                "SELECT set_config('statement_timeout', $1, true), "
+                "set_config('plan_cache_mode', 'force_custom_plan', true)"
+            ),
+            # The most similar names are looked up first, and then the first persons of each, so the number of rows
+            # read is bounded by the limit however common a name is. Persons are ranked by their full names.
+            "search": (
+                f"SELECT DISTINCT ON (distance, id) {columns} FROM ("  # noqa: S608
+                f"SELECT {table}.*, $1 <<-> ({table}.first_name || ' ' || {table}.last_name) AS distance "
+                f"FROM (SELECT name FROM {table}_name WHERE $1 <% name "
+                "ORDER BY $1 <<-> name, name LIMIT $2) AS candidate "
+                "CROSS JOIN LATERAL ("
+                f'(SELECT * FROM {table} WHERE first_name COLLATE "C" = candidate.name '
+                'ORDER BY first_name COLLATE "C", id LIMIT $2) '
+                "UNION ALL "
+                f'(SELECT * FROM {table} WHERE last_name COLLATE "C" = candidate.name '
+                'ORDER BY last_name COLLATE "C", id LIMIT $2)'
+                f") AS {table}"
+                f") AS {table} ORDER BY distance, id LIMIT $2"
+            ),
+            "write": (
+                f"INSERT INTO {table} (first_name, last_name, gender, birthdate) "  # noqa: S608
+                "VALUES ($1, $2, $3, $4) RETURNING *"
+            ),
+        }
 
     async def read_all(self) -> list[Person]:
         return await self._read_all()
 
-    @from_dict()
+    def stream_all(self, prefetch: int) -> AsyncIterator[list[Person]]:
+        return self._stream_all(prefetch)
+
+    async def read_statistics(self, age_group_size: int) -> PersonStatistics:
+        records = await self._fetch("read_statistics", age_group_size)
+
+        statistics: dict[str, Any] = {field: {} for field, _ in self.groupings.values()}
+        for record in records:
+            if (grouping := self.groupings.get(record["grouping"])) is not None:
+                field, column = grouping
+                statistics[field][record[column]] = record["count"]
+            else:
+                statistics |= {
+                    "total": record["count"],
+                    "min_age": record["min_age"],
+                    "max_age": record["max_age"],
+                    "median_age": record["median_age"],
+                }
+
+        return PersonStatistics(**statistics)
+
+    async def read_count(self) -> int:
+        return cast("int", await self._fetchval("read_count"))
+
+    async def read_revision(self) -> int:
+        return cast("int", await self._fetchval("read_revision", self.table))
+
+    async def read_snapshot(self, prefetch: int) -> tuple[datetime, list[str]]:
+        created_at = await self._fetchval("read_snapshot_time", self.table)
+        # Rows are fetched in batches, since an aggregate of all of them could exceed the size limit of a value.
+        parts = [
+            ",".join(record["data"] for record in records) async for records in self._stream("read_snapshot", prefetch)
+        ]
+
+        return created_at, parts
+
+    async def refresh_snapshot(self, staleness: float) -> None:
+        # Runs in a repeatable read transaction: rows of transactions that were still in progress have identifiers not
+        # less than the snapshot minimum, so the next refresh applies them. Deletions reset the minimum to rebuild it.
+        if not await self._fetchval("lock_snapshot", self.table):
+            return
+
+        state = cast("Record", await self._fetchrow("read_snapshot_state", self.table, staleness))
+        if state["fresh"] or not (state["changed"] or state["min_xid"] == 0):
+            return
+
+        try:
+            async with self._conn.transaction():
+                if state["min_xid"] == 0:
+                    await self._fetch("clear_snapshot")
+                await self._fetch("refresh_snapshot", state["min_xid"])
+                await self._fetch("update_snapshot", self.table)
+        except SerializationError:
+            # Persons were deleted concurrently, and the reset minimum makes the next refresh rebuild the snapshot.
+            return
+
+    @classmethod
+    def build_page_query(
+        cls,
+        limit: int,
+        after: Sequence[Any] | None = None,
+        filters: PersonFilter | None = None,
+        sort: PersonSort = "id",
+    ) -> tuple[str, list[Any]]:
+        args: list[Any] = []
+
+        def bind(value: Any) -> str:
+            args.append(value)
+            return f"${len(args)}"
+
+        conditions = []
+        if filters is not None:
+            if filters.gender is not None:
+                conditions.append(f"gender = {bind(filters.gender)}")
+            if filters.birthdate_from is not None:
+                conditions.append(f"birthdate >= {bind(filters.birthdate_from)}")
+            if filters.birthdate_to is not None:
+                conditions.append(f"birthdate <= {bind(filters.birthdate_to)}")
+            for field in "first_name", "last_name":
+                column = f'{field} COLLATE "C"'
+                if (value := getattr(filters, field)) is not None:
+                    conditions.append(f"{column} = {bind(value)}")
+                if (prefix := getattr(filters, f"{field}_prefix")) is not None:
+                    conditions += _get_prefix_conditions(column, prefix, bind)
+
+        descending = sort.startswith("-")
+        columns = [column for _, column in cls.get_sort_keys(sort)]
+        if after is not None:
+            values = ", ".join(bind(value) for value in after)
+            conditions.append(f"({', '.join(columns)}) {'<' if descending else '>'} ({values})")
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = ", ".join(f"{column} DESC" if descending else column for column in columns)
+        return f"SELECT * FROM {cls.table}{where} ORDER BY {order} LIMIT {bind(limit)}", args  # noqa: S608
+
+    @classmethod
+    def get_sort_keys(cls, sort: PersonSort) -> list[tuple[str, str]]:
+        key = cls.sorts[sort.removeprefix("-")]
+
+        return [key] if key[0] == "id" else [key, cls.sorts["id"]]
+
+    async def read_page(
+        self,
+        limit: int,
+        after: str | None = None,
+        filters: PersonFilter | None = None,
+        sort: PersonSort = "id",
+    ) -> Page[Person]:
+        if sort == "id" and (
+            filters is None or all(getattr(filters, field) is None for field in PersonFilter.model_fields)
+        ):
+            return await self._read_page(limit, after)
+
+        keys = [field for field, _ in self.get_sort_keys(sort)]
+        query, args = self.build_page_query(
+            limit + 1,
+            None if after is None else self._decode_cursor(after, keys),
+            filters,
+            sort,
+        )
+
+        return self._to_page(await self._read_filtered(query, *args), limit, keys)
+
+    @from_dicts(trusted=True)
+    async def _read_filtered(self, query: str, *args: Any) -> list[Record]:
+        return await self._fetch("read_page", *args, query=query)
+
+    async def search(self, query: str, limit: int, statement_timeout: float) -> list[Person]:
+        # Generic plans cannot tell how selective the trigram index is for a query, so each one is planned.
+        try:
+            async with self._conn.transaction():
+                await self._fetch("configure_search", str(round(statement_timeout * 1000)))
+                return await self._search(query, limit)
+        except QueryCanceledError as exc:
+            raise DBTimeoutError from exc
+
+    @from_dicts(trusted=True)
+    async def _search(self, query: str, limit: int) -> list[Record]:
+        return await self._fetch("search", query, limit)
+
+    @invalidates
+    @from_dict(trusted=True)
     @Schema.to_tuple
     async def write(self, person: PersonCreate) -> Person:
-        row = await self._conn.fetchrow(
-            f"INSERT INTO {self.schema.__name__.lower()} (first_name, last_name, gender, birthdate) "  # noqa: S608
-            "VALUES ($1, $2, $3, $4) RETURNING *",
-            *person,
-        )
-        return cast(Person, row)
+        return cast("Person", await self._fetchrow("write", *person))
+
+    @invalidates
+    async def write_many(self, persons: Sequence[PersonCreate]) -> list[Person]:
+        persons_ = [self.schema.model_construct(id=uuid4(), **dict(person)) for person in persons]
+        await self._write_many(persons_)
+
+        return cast("list[Person]", persons_)
+
+
+def _get_prefix_conditions(column: str, prefix: str, bind: Callable[[Any], str]) -> list[str]:
+    # A range instead of LIKE, so the index is used by generic plans of prepared statements too.
+    conditions = [f"{column} >= {bind(prefix)}"]
+    if (successor := _get_successor(prefix)) is not None:
+        conditions.append(f"{column} < {bind(successor)}")
+
+    return conditions
+
+
+def _get_successor(prefix: str) -> str | None:
+    # Strings are compared by code points, and the last one cannot be incremented. Surrogates are not valid in UTF-8.
+    if not (prefix := prefix.rstrip(chr(maxunicode))):
+        return None
+
+    code = ord(prefix[-1]) + 1
+    return prefix[:-1] + chr(SURROGATES_END if SURROGATES_START <= code < SURROGATES_END else code)
+
+
+PersonDALFactory = Callable[[], AbstractAsyncContextManager[PersonDAL]]
@@ -1,13 +1,40 @@
-from functools import lru_cache
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, FastAPI, Request
 
-from src.dependencies import ConnDep
-from src.persons.data_access_layer import PersonAsyncpgDAL, PersonDAL
-from src.persons.schemas import PersonCreate
+from src.db.db_manager import AsyncpgManager, Isolation
+from src.dependencies import (
+    AsyncpgManagerDep,
+    get_api_settings,
+    get_search_settings,
+    open_unit_of_work,
+)
+from src.persons.data_access_layer import PersonAsyncpgDAL, PersonDALFactory
+from src.persons.schemas import PersonCreate, PersonCreateBatch
 from src.persons.service import PersonService
-from src.persons.utils.clients import HTTPClient
+from src.persons.utils.clients import HTTPClient, PrefetchingClient
+from src.persons.utils.policies import CircuitBreaker, Hedging
+
+
+def get_breaker() -> CircuitBreaker | None:
+    if not get_api_settings().breaker_window:
+        return None
+
+    return CircuitBreaker(
+        window=get_api_settings().breaker_window,
+        failure_rate=get_api_settings().breaker_failure_rate,
+        reset_timeout=get_api_settings().breaker_reset_timeout,
+    )
+
+
+def get_hedging() -> Hedging | None:
+    if not get_api_settings().hedging_quantile:
+        return None
+
+    return Hedging(quantile=get_api_settings().hedging_quantile)
 
 
 @lru_cache
@@ -15,6 +42,8 @@ def get_fakerapi_client() -> HTTPClient:
     return HTTPClient(
         url="https://fakerapi.it/api/v2/persons?_quantity=1",
         schema=PersonCreate,
+        breaker=get_breaker(),
+        hedging=get_hedging(),
     )
 
 
@@ -22,19 +51,105 @@ FakerAPIClientDep = Annotated[HTTPClient, Depends(get_fakerapi_client)]
 
 
 @lru_cache
-def get_person_asyncpg_dal(conn: ConnDep) -> PersonAsyncpgDAL:
-    return PersonAsyncpgDAL(_conn=conn)
+def get_fakerapi_bulk_client() -> HTTPClient:
+    return HTTPClient(
+        url="https://fakerapi.it/api/v2/persons",
+        schema=PersonCreateBatch,
+        # Bulk requests are too expensive to hedge, and their failures must not open the single client's circuit.
+        breaker=get_breaker(),
+    )
 
 
-PersonAsyncpgDALDep = Annotated[PersonDAL, Depends(get_person_asyncpg_dal)]
+FakerAPIBulkClientDep = Annotated[HTTPClient, Depends(get_fakerapi_bulk_client)]
 
 
-@lru_cache
-def get_person_service(
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    get_client = app.dependency_overrides.get(get_fakerapi_bulk_client, get_fakerapi_bulk_client)
+    app.state.person_prefetcher = PrefetchingClient(
+        client=get_client(),
+        low=get_api_settings().prefetch_low,
+        high=get_api_settings().prefetch_high,
+        batch_size=get_api_settings().batch_size,
+    )
+
+    async with app.state.person_prefetcher:
+        yield
+
+
+async def get_person_prefetcher(request: Request) -> PrefetchingClient:
+    return request.app.state.person_prefetcher
+
+
+PersonPrefetcherDep = Annotated[PrefetchingClient, Depends(get_person_prefetcher)]
+
+
+@asynccontextmanager
+async def open_person_asyncpg_dal(
+    db_manager: AsyncpgManager,
+    *,
+    read_only: bool = False,
+    isolation: Isolation | None = None,
+) -> AsyncGenerator[PersonAsyncpgDAL]:
+    async with open_unit_of_work(db_manager, read_only=read_only, isolation=isolation) as unit_of_work:
+        yield unit_of_work.get_dal(PersonAsyncpgDAL)
+
+
+async def get_person_asyncpg_dal_factory(db_manager: AsyncpgManagerDep) -> PersonDALFactory:
+    return partial(open_person_asyncpg_dal, db_manager)
+
+
+PersonAsyncpgDALFactoryDep = Annotated[PersonDALFactory, Depends(get_person_asyncpg_dal_factory)]
+
+
+async def get_person_asyncpg_read_dal_factory(db_manager: AsyncpgManagerDep) -> PersonDALFactory:
+    return partial(open_person_asyncpg_dal, db_manager, read_only=True)
+
+
+PersonAsyncpgReadDALFactoryDep = Annotated[PersonDALFactory, Depends(get_person_asyncpg_read_dal_factory)]
+
+
+async def get_person_asyncpg_snapshot_dal_factory(db_manager: AsyncpgManagerDep) -> PersonDALFactory:
+    # A snapshot is refreshed from one consistent view of persons and their revision.
+    return partial(open_person_asyncpg_dal, db_manager, isolation="repeatable_read")
+
+
+PersonAsyncpgSnapshotDALFactoryDep = Annotated[PersonDALFactory, Depends(get_person_asyncpg_snapshot_dal_factory)]
+
+
+async def get_person_service(
     person_client: FakerAPIClientDep,
-    person_dal: PersonAsyncpgDALDep,
+    person_bulk_client: FakerAPIBulkClientDep,
+    person_prefetcher: PersonPrefetcherDep,
+    person_dal_factory: PersonAsyncpgDALFactoryDep,
 ) -> PersonService:
-    return PersonService(person_client=person_client, person_dal=person_dal)
+    return PersonService(
+        person_client=person_client,
+        person_bulk_client=person_bulk_client,
+        person_prefetcher=person_prefetcher,
+        person_dal_factory=person_dal_factory,
+        batch_size=get_api_settings().batch_size,
+        search_timeout=get_search_settings().timeout,
+    )
 
 
 PersonServiceDep = Annotated[PersonService, Depends(get_person_service)]
+
+
+async def get_person_read_service(
+    person_client: FakerAPIClientDep,
+    person_bulk_client: FakerAPIBulkClientDep,
+    person_prefetcher: PersonPrefetcherDep,
+    person_dal_factory: PersonAsyncpgReadDALFactoryDep,
+) -> PersonService:
+    return PersonService(
+        person_client=person_client,
+        person_bulk_client=person_bulk_client,
+        person_prefetcher=person_prefetcher,
+        person_dal_factory=person_dal_factory,
+        batch_size=get_api_settings().batch_size,
+        search_timeout=get_search_settings().timeout,
+    )
+
+
+PersonReadServiceDep = Annotated[PersonService, Depends(get_person_read_service)]
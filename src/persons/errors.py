@@ -1,3 +1,8 @@
 class ExternalAPIError(Exception):
     def __init__(self, msg: str = "External service error.") -> None:
         super().__init__(msg)
+
+
+class CircuitOpenError(ExternalAPIError):
+    def __init__(self, msg: str = "External service is temporarily unavailable.") -> None:
+        super().__init__(msg)
@@ -1,24 +1,46 @@
-from fastapi import status
+from typing import Annotated
+
+from fastapi import Query, status
 from fastapi.routing import APIRouter
 
-from src.errors import db_conn_response, unexpected_exception_response
-from src.persons.dependencies import PersonServiceDep
-from src.persons.schemas import Person
-from src.schemas import Error
+from src.errors import db_conn_response, db_timeout_response, unexpected_exception_response, validation_response
+from src.persons.dependencies import PersonReadServiceDep, PersonServiceDep, lifespan
+from src.persons.schemas import Person, PersonQuery, PersonSearchQuery
+from src.schemas import Error, Page
 
-router = APIRouter(prefix="/persons", tags=["Persons"])
+router = APIRouter(prefix="/persons", tags=["Persons"], lifespan=lifespan)
 
 
 @router.get(
     "",
     status_code=status.HTTP_200_OK,
-    summary="All persons retrieval.",
-    response_description="All persons are successfully retrieved.",
-    responses={**db_conn_response, **unexpected_exception_response},
+    summary="Stored persons retrieval.",
+    response_description="A page of stored persons is successfully retrieved.",
+    responses={**db_conn_response, **unexpected_exception_response, **validation_response},
+)
+async def get_all(
+    person_service: PersonReadServiceDep,
+    query: Annotated[PersonQuery, Query()],
+) -> Page[Person]:
+    """Retrieves and returns a page of stored persons matching the filters, ordered by the sort key and then by ID.
+    Names are compared by their code points, and a cursor is valid only for the sort it was returned with."""
+    return await person_service.get_page(query.limit, query.after, query, query.sort)
+
+
+@router.get(
+    "/search",
+    status_code=status.HTTP_200_OK,
+    summary="Stored persons search.",
+    response_description="The most similar stored persons are successfully retrieved.",
+    responses={**db_conn_response, **db_timeout_response, **unexpected_exception_response, **validation_response},
 )
-async def get_all(person_service: PersonServiceDep) -> list[Person]:
-    """Retrieves and returns all stored persons."""
-    return await person_service.get_all()
+async def search(
+    person_service: PersonReadServiceDep,
+    query: Annotated[PersonSearchQuery, Query()],
+) -> list[Person]:
+    """Retrieves and returns stored persons whose names are the most similar to the query, the most similar first.
+    Query is compared with each word of names by trigrams, so it may be a beginning of a name or contain typos."""
+    return await person_service.search(query.q, query.limit)
 
 
 @router.post(
@@ -39,3 +61,27 @@ async def get_all(person_service: PersonServiceDep) -> list[Person]:
 async def create_random(person_service: PersonServiceDep) -> Person:
     """Creates, saves and returns a random person retrieved from an external API."""
     return await person_service.create_random()
+
+
+@router.post(
+    "/bulk",
+    status_code=status.HTTP_201_CREATED,
+    summary="Random persons creation.",
+    response_description="Random persons are successfully created.",
+    responses={
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "description": "Random persons could have been created, but they could not be retrieved due to the "
+            "external API not being available.",
+            "model": Error,
+        },
+        **db_conn_response,
+        **unexpected_exception_response,
+        **validation_response,
+    },
+)
+async def create_random_many(
+    person_service: PersonServiceDep,
+    count: Annotated[int, Query(ge=1, le=100_000)],
+) -> list[Person]:
+    """Creates, saves and returns random persons retrieved from an external API in batches."""
+    return await person_service.create_random_many(count)
@@ -1,3 +1,4 @@
+from datetime import date
 from typing import Annotated, Literal
 from uuid import UUID
 
@@ -11,8 +12,9 @@ class PersonCreate(Schema):
         NonEmptyStr,
         Field(
             validation_alias=AliasChoices(
-                AliasPath("data", 0, "firstname"),
                 "firstName",
+                "firstname",
+                AliasPath("data", 0, "firstname"),
             ),
             max_length=100,
             examples=["Rosa"],
@@ -21,7 +23,7 @@ class PersonCreate(Schema):
     last_name: Annotated[
         NonEmptyStr,
         Field(
-            validation_alias=AliasChoices(AliasPath("data", 0, "lastname"), "lastName"),
+            validation_alias=AliasChoices("lastName", "lastname", AliasPath("data", 0, "lastname")),
             max_length=100,
             examples=["Sanford"],
         ),
@@ -29,16 +31,54 @@ class PersonCreate(Schema):
 
     gender: Annotated[
         Literal["male", "female", "other"],
-        Field(validation_alias=AliasPath("data", 0, "gender"), examples=["female"]),
+        Field(validation_alias=AliasChoices("gender", AliasPath("data", 0, "gender")), examples=["female"]),
     ]
     birthdate: Annotated[
         PastDate,
         Field(
-            validation_alias=AliasPath("data", 0, "birthday"),
+            validation_alias=AliasChoices("birthdate", "birthday", AliasPath("data", 0, "birthday")),
             examples=["1999-03-16"],
         ),
     ]
 
 
+class PersonCreateBatch(Schema):
+    persons: Annotated[list[PersonCreate], Field(validation_alias="data")]
+
+
 class Person(PersonCreate):
     id: Annotated[UUID, Field(examples=["94e2f14c-4d8f-4d5e-9b4d-e0e2f57597f8"])]
+
+
+class PersonStatistics(Schema):
+    total: Annotated[int, Field(ge=0, examples=[2])]
+    genders: Annotated[dict[str, int], Field(examples=[{"female": 1, "male": 1}])]
+    age_groups: Annotated[dict[int, int], Field(examples=[{20: 2}])]
+    birth_years: Annotated[dict[int, int], Field(examples=[{1999: 1, 2001: 1}])]
+    min_age: Annotated[int | None, Field(examples=[24])] = None
+    max_age: Annotated[int | None, Field(examples=[26])] = None
+    median_age: Annotated[float | None, Field(examples=[25.0])] = None
+
+
+class PersonFilter(Schema):
+    gender: Literal["male", "female", "other"] | None = None
+    birthdate_from: date | None = None
+    birthdate_to: date | None = None
+    first_name: Annotated[NonEmptyStr | None, Field(max_length=100)] = None
+    first_name_prefix: Annotated[NonEmptyStr | None, Field(max_length=100)] = None
+    last_name: Annotated[NonEmptyStr | None, Field(max_length=100)] = None
+    last_name_prefix: Annotated[NonEmptyStr | None, Field(max_length=100)] = None
+
+
+PersonSort = Literal["id", "-id", "firstName", "-firstName", "lastName", "-lastName", "birthdate", "-birthdate"]
+
+
+class PersonQuery(PersonFilter):
+    limit: Annotated[int, Field(ge=1, le=1000)] = 100
+    after: Annotated[str | None, Field(description="«next» value of the previous page.")] = None
+    sort: Annotated[PersonSort, Field(description="Sort key, prefixed with «-» for descending order.")] = "id"
+
+
+class PersonSearchQuery(Schema):
+    q: Annotated[str, Field(min_length=3, max_length=100, description="A part of a first name, a last name or both.")]
+    limit: Annotated[int, Field(ge=1, le=50)] = 10
@@ -1,19 +1,48 @@
+from asyncio import gather
 from dataclasses import dataclass
 
-from src.persons.data_access_layer import PersonDAL
-from src.persons.schemas import Person
-from src.persons.utils.clients import HTTPClient
+from src.persons.data_access_layer import PersonDALFactory
+from src.persons.schemas import Person, PersonFilter, PersonSort
+from src.persons.utils.clients import HTTPClient, PrefetchingClient
+from src.schemas import Page
 
 
 @dataclass(kw_only=True, frozen=True, slots=True)
 class PersonService:
     person_client: HTTPClient
-    person_dal: PersonDAL
+    person_bulk_client: HTTPClient
+    person_prefetcher: PrefetchingClient
+    person_dal_factory: PersonDALFactory
+    batch_size: int
+    search_timeout: float
 
-    async def get_all(self) -> list[Person]:
-        return await self.person_dal.read_all()
+    async def get_page(
+        self,
+        limit: int,
+        after: str | None = None,
+        filters: PersonFilter | None = None,
+        sort: PersonSort = "id",
+    ) -> Page[Person]:
+        async with self.person_dal_factory() as person_dal:
+            return await person_dal.read_page(limit, after, filters, sort)
+
+    async def search(self, query: str, limit: int) -> list[Person]:
+        async with self.person_dal_factory() as person_dal:
+            return await person_dal.search(query, limit, self.search_timeout)
 
     async def create_random(self) -> Person:
-        person = await self.person_client.request("GET")
+        person = self.person_prefetcher.get() or await self.person_client.request("GET")
+
+        async with self.person_dal_factory() as person_dal:
+            return await person_dal.write(person)
+
+    async def create_random_many(self, count: int) -> list[Person]:
+        batches = await gather(
+            *(
+                self.person_bulk_client.request("GET", params={"_quantity": min(self.batch_size, count - start)})
+                for start in range(0, count, self.batch_size)
+            ),
+        )
 
-        return await self.person_dal.write(person)
+        async with self.person_dal_factory() as person_dal:
+            return await person_dal.write_many([person for batch in batches for person in batch.persons])
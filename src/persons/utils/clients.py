@@ -1,36 +1,181 @@
+from asyncio import FIRST_COMPLETED, CancelledError, Event, Task, create_task, wait
+from collections import deque
+from contextlib import suppress
 from dataclasses import dataclass, field
-from typing import Any
+from time import monotonic
+from types import TracebackType
+from typing import Any, ClassVar
+from urllib.parse import urlsplit
 
-from httpx import AsyncClient, HTTPStatusError, RequestError
+from httpx import AsyncClient, HTTPStatusError, RequestError, Response
 
-from src.dependencies import get_api_settings
-from src.persons.errors import ExternalAPIError
+from src.dependencies import get_api_settings, get_http_session
+from src.metrics import CACHE_LOOKUPS, UPSTREAM_ERRORS, UPSTREAM_SECONDS
+from src.persons.errors import CircuitOpenError, ExternalAPIError
+from src.persons.schemas import PersonCreate
+from src.persons.utils.policies import CircuitBreaker, Hedging
 from src.schemas import Schema, from_dict
+from src.settings import LOGGER
 
 
 @dataclass(kw_only=True, slots=True, frozen=True)
 class HTTPClient:
+    idempotent: ClassVar[frozenset[str]] = frozenset({"GET", "HEAD", "OPTIONS"})
+
     url: str
     schema: type[Schema]
 
-    session: AsyncClient = field(default_factory=AsyncClient)
-    timeout: float = get_api_settings().timeout
+    session: AsyncClient | None = None
+    timeout: float = field(default_factory=lambda: get_api_settings().timeout)
+    breaker: CircuitBreaker | None = None
+    hedging: Hedging | None = None
 
     @from_dict()
     async def request(self, method: str, **kwargs: Any) -> Any:
+        if self.breaker is not None and not self.breaker.allow():
+            UPSTREAM_ERRORS.inc(self.host, "circuit_open")
+            raise CircuitOpenError
+        # Only one request at a time is let through an open circuit, and only it may release the probe.
+        probe = self.breaker is not None and self.breaker.probing
+
         try:
-            response = await self.session.request(
-                method,
-                self.url,
-                timeout=self.timeout,
-                **kwargs,
-            )
+            response = await self._send(method, **kwargs)
         except RequestError as exc:
+            UPSTREAM_ERRORS.inc(self.host, type(exc).__name__)
+            self._record(success=False, probe=probe)
             raise ExternalAPIError from exc
+        except BaseException:
+            if probe and self.breaker is not None:
+                self.breaker.release()
+            raise
 
+        self._record(success=not response.is_server_error, probe=probe)
         try:
             response.raise_for_status()
         except HTTPStatusError as exc:
+            UPSTREAM_ERRORS.inc(self.host, str(response.status_code))
             raise ExternalAPIError from exc
 
         return response.json()
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.url).hostname or ""
+
+    def _record(self, *, success: bool, probe: bool) -> None:
+        if self.breaker is not None:
+            self.breaker.record(success=success, probe=probe)
+
+    async def _send(self, method: str, **kwargs: Any) -> Response:
+        delay = None if self.hedging is None or method not in self.idempotent else self.hedging.delay()
+        if delay is None:
+            return await self._attempt(method, **kwargs)
+
+        pending = {create_task(self._attempt(method, **kwargs))}
+        try:
+            done, pending = await wait(pending, timeout=delay)
+            if not done:
+                pending.add(create_task(self._attempt(method, **kwargs)))
+                done, pending = await wait(pending, return_when=FIRST_COMPLETED)
+                if pending and all(task.exception() is not None for task in done):
+                    done, pending = await wait(pending)
+
+            return min(done, key=lambda task: task.exception() is not None).result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _attempt(self, method: str, **kwargs: Any) -> Response:
+        start = monotonic()
+        try:
+            response = await (self.session or get_http_session()).request(
+                method,
+                self.url,
+                timeout=self.timeout,
+                **kwargs,
+            )
+        except Exception:
+            # Failures are slow as often as not, and leaving them out would make hedging more eager under load.
+            self._observe(method, monotonic() - start)
+            raise
+
+        self._observe(method, monotonic() - start)
+        return response
+
+    def _observe(self, method: str, latency: float) -> None:
+        UPSTREAM_SECONDS.observe(latency, self.host, method)
+        if self.hedging is not None:
+            self.hedging.latencies.append(latency)
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class PrefetchingClient:
+    client: HTTPClient
+    low: int
+    high: int
+    batch_size: int
+
+    queue: deque[PersonCreate] = field(default_factory=deque)
+    hits: int = 0
+    misses: int = 0
+    filled: Event = field(default_factory=Event)
+
+    _refill: Event = field(default_factory=Event)
+    _task: Task[None] | None = None
+
+    def get(self) -> PersonCreate | None:
+        if len(self.queue) <= self.low:
+            self._refill.set()
+
+        if not self.queue:
+            self.misses += 1
+            CACHE_LOOKUPS.inc("prefetched_persons", "miss")
+            return None
+
+        self.hits += 1
+        CACHE_LOOKUPS.inc("prefetched_persons", "hit")
+        self.filled.clear()
+        return self.queue.popleft()
+
+    async def _fill(self) -> None:
+        while True:
+            await self._refill.wait()
+            self._refill.clear()
+
+            while len(self.queue) < self.high:
+                try:
+                    batch = await self.client.request(
+                        "GET",
+                        params={"_quantity": min(self.batch_size, self.high - len(self.queue))},
+                    )
+                except ExternalAPIError as exc:
+                    LOGGER.warning(exc)
+                    break
+                except Exception:  # noqa: BLE001
+                    # Any other error would end the task silently, and every following creation would miss.
+                    LOGGER.exception("Random persons are not prefetched.")
+                    break
+
+                self.queue.extend(batch.persons)
+
+            if len(self.queue) >= self.high:
+                self.filled.set()
+
+    async def __aenter__(self) -> None:
+        self.filled = Event()
+        self._refill = Event()
+        self._refill.set()
+        self._task = create_task(self._fill())
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        assert self._task is not None
+
+        self._task.cancel()
+        with suppress(CancelledError):
+            await self._task
+        self._task = None
@@ -0,0 +1,58 @@
+from collections import deque
+from dataclasses import dataclass, field
+from time import monotonic
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class CircuitBreaker:
+    window: int
+    failure_rate: float
+    reset_timeout: float
+
+    results: deque[bool] = field(default_factory=deque)
+    opened_at: float | None = None
+    probing: bool = False
+
+    def __post_init__(self) -> None:
+        self.results = deque(maxlen=self.window)
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.probing or monotonic() - self.opened_at < self.reset_timeout:
+            return False
+
+        self.probing = True
+        return True
+
+    def record(self, *, success: bool, probe: bool = False) -> None:
+        if probe:
+            self.probing = False
+            self.opened_at = None if success else monotonic()
+            return
+        # Requests sent before the circuit opened do not decide whether it closes.
+        if self.opened_at is not None:
+            return
+
+        self.results.append(success)
+        if len(self.results) == self.window and self.results.count(False) >= self.failure_rate * self.window:
+            self.opened_at = monotonic()
+            self.results.clear()
+
+    def release(self) -> None:
+        self.probing = False
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class Hedging:
+    quantile: float
+    min_samples: int = 20
+
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=100))
+
+    def delay(self) -> float | None:
+        if not self.latencies or len(self.latencies) < self.min_samples:
+            return None
+
+        ordered = sorted(self.latencies)
+        return ordered[round(self.quantile * (len(ordered) - 1))]
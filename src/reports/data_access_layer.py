@@ -0,0 +1,147 @@
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from functools import partial
+from typing import Literal
+from uuid import UUID
+
+from src.cache import INVALIDATOR
+from src.data_access_layer import AsyncpgDAL, invalidates
+from src.reports.schemas import ReportJob
+from src.schemas import construct
+
+COLUMNS: str = ", ".join(ReportJob.model_fields)
+
+
+class ReportJobDAL(ABC):
+    @abstractmethod
+    async def read(self, job_id: UUID) -> ReportJob | None:
+        pass
+
+    @abstractmethod
+    async def read_result(self, job_id: UUID) -> str | None:
+        pass
+
+    @abstractmethod
+    async def read_by_revision(self, revision: int) -> ReportJob | None:
+        pass
+
+    @abstractmethod
+    async def create(self, revision: int, ttl: float) -> ReportJob | None:
+        pass
+
+    @abstractmethod
+    async def update(
+        self,
+        job_id: UUID,
+        status: Literal["running", "failed"],
+        progress: float | None = None,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def beat(self, job_id: UUID) -> None:
+        pass
+
+    @abstractmethod
+    async def finish(self, job_id: UUID, result: str) -> None:
+        pass
+
+    @abstractmethod
+    async def fail_stale(self, lease: float) -> int:
+        pass
+
+    @abstractmethod
+    async def delete_expired(self) -> int:
+        pass
+
+
+class ReportJobAsyncpgDAL(ReportJobDAL, AsyncpgDAL):
+    schema = ReportJob
+    table = "report"
+
+    @classmethod
+    def build_statements(cls, table: str, keys: str) -> dict[str, str]:
+        return super().build_statements(table, keys) | {
+            "read": f"SELECT {COLUMNS} FROM {table} WHERE id = $1 AND expires_at > now()",  # noqa: S608
+            "read_result": f"SELECT result::text FROM {table} WHERE id = $1",  # noqa: S608
+            "read_by_revision": (
+                f"SELECT {COLUMNS} FROM {table} "  # noqa: S608
+                "WHERE revision = $1 AND status <> 'failed' AND expires_at > now()"
+            ),
+            # Only one job that has not failed may exist per revision, so concurrent requests share it.
+            "create": (
+                f"INSERT INTO {table} (revision, expires_at) VALUES ($1, now() + make_interval(secs => $2)) "  # noqa: S608
+                f"ON CONFLICT (revision) WHERE status <> 'failed' DO NOTHING RETURNING {COLUMNS}"
+            ),
+            # A job failed as stale is not revived by its worker, since another job may have replaced it.
+            "update": (
+                f"UPDATE {table} SET status = $2, progress = coalesce($3, progress), heartbeat_at = now() "  # noqa: S608
+                "WHERE id = $1 AND status <> 'failed'"
+            ),
+            "beat": f"UPDATE {table} SET heartbeat_at = now() WHERE id = $1 AND status = 'running'",  # noqa: S608
+            "finish": (
+                f"UPDATE {table} SET status = 'done', progress = 1, result = $2::text::json "  # noqa: S608
+                "WHERE id = $1 AND status <> 'failed'"
+            ),
+            "fail_stale": (
+                f"WITH failed AS (UPDATE {table} SET status = 'failed' "  # noqa: S608
+                "WHERE status = 'running' AND heartbeat_at < now() - make_interval(secs => $1) RETURNING 1) "
+                "SELECT count(*) FROM failed"
+            ),
+            "delete_expired": (
+                f"WITH deleted AS (DELETE FROM {table} WHERE expires_at <= now() RETURNING 1) "  # noqa: S608
+                "SELECT count(*) FROM deleted"
+            ),
+        }
+
+    async def read(self, job_id: UUID) -> ReportJob | None:
+        record = await self._fetchrow("read", job_id)
+
+        return None if record is None else construct(ReportJob, record)
+
+    async def read_result(self, job_id: UUID) -> str | None:
+        return await self._fetchval("read_result", job_id)  # type: ignore[no-any-return]
+
+    async def read_by_revision(self, revision: int) -> ReportJob | None:
+        record = await self._fetchrow("read_by_revision", revision)
+
+        return None if record is None else construct(ReportJob, record)
+
+    @invalidates
+    async def create(self, revision: int, ttl: float) -> ReportJob | None:
+        record = await self._fetchrow("create", revision, ttl)
+
+        return None if record is None else construct(ReportJob, record)
+
+    @invalidates
+    async def update(
+        self,
+        job_id: UUID,
+        status: Literal["running", "failed"],
+        progress: float | None = None,
+    ) -> None:
+        await self._fetch("update", job_id, status, progress)
+
+    async def beat(self, job_id: UUID) -> None:
+        await self._fetch("beat", job_id)
+
+    @invalidates
+    async def finish(self, job_id: UUID, result: str) -> None:
+        await self._fetch("finish", job_id, result)
+
+    async def fail_stale(self, lease: float) -> int:
+        return await self._invalidate_changed(await self._fetchval("fail_stale", lease))
+
+    async def delete_expired(self) -> int:
+        return await self._invalidate_changed(await self._fetchval("delete_expired"))
+
+    async def _invalidate_changed(self, count: int) -> int:
+        # Most requests find nothing to clean up, and cached responses are kept then.
+        if count:
+            await self._after_commit(partial(INVALIDATOR.publish, (self.table,)))
+
+        return count
+
+
+ReportJobDALFactory = Callable[[], AbstractAsyncContextManager[ReportJobDAL]]
@@ -1,15 +1,102 @@
-from functools import lru_cache
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
 from typing import Annotated
 
 from fastapi import Depends
 
-from src.persons.dependencies import PersonAsyncpgDALDep
-from src.reports.service import ReportService
+from src.db.db_manager import AsyncpgManager
+from src.dependencies import (
+    AsyncpgManagerDep,
+    TaskRunnerDep,
+    get_db_settings,
+    get_ingest_settings,
+    get_process_pool,
+    get_process_pool_settings,
+    get_report_job_settings,
+    get_report_snapshot_settings,
+)
+from src.persons.dependencies import PersonAsyncpgReadDALFactoryDep, PersonAsyncpgSnapshotDALFactoryDep
+from src.reports.data_access_layer import ReportJobAsyncpgDAL, ReportJobDALFactory
+from src.reports.service import (
+    ReportBuildingService,
+    ReportIngestingService,
+    ReportJobService,
+    ReportService,
+    ReportStreamingService,
+)
 
 
-@lru_cache
-def get_report_service(person_dal: PersonAsyncpgDALDep) -> ReportService:
-    return ReportService(person_dal=person_dal)
+async def get_report_service(
+    person_read_dal_factory: PersonAsyncpgReadDALFactoryDep,
+    person_snapshot_dal_factory: PersonAsyncpgSnapshotDALFactoryDep,
+) -> ReportService:
+    return ReportService(
+        person_read_dal_factory=person_read_dal_factory,
+        person_snapshot_dal_factory=person_snapshot_dal_factory,
+        staleness=get_report_snapshot_settings().staleness,
+        prefetch=get_db_settings().cursor_prefetch,
+    )
 
 
 ReportServiceDep = Annotated[ReportService, Depends(get_report_service)]
+
+
+@lru_cache
+def get_report_building_service() -> ReportBuildingService:
+    return ReportBuildingService(
+        process_pool=get_process_pool(),
+        **get_process_pool_settings().model_dump(exclude={"size"}),
+    )
+
+
+ReportBuildingServiceDep = Annotated[ReportBuildingService, Depends(get_report_building_service)]
+
+
+async def get_report_streaming_service(person_dal_factory: PersonAsyncpgReadDALFactoryDep) -> ReportStreamingService:
+    return ReportStreamingService(
+        person_dal_factory=person_dal_factory,
+        prefetch=get_db_settings().cursor_prefetch,
+    )
+
+
+ReportStreamingServiceDep = Annotated[ReportStreamingService, Depends(get_report_streaming_service)]
+
+
+@lru_cache
+def get_report_ingesting_service() -> ReportIngestingService:
+    return ReportIngestingService(**get_ingest_settings().model_dump())
+
+
+ReportIngestingServiceDep = Annotated[ReportIngestingService, Depends(get_report_ingesting_service)]
+
+
+@asynccontextmanager
+async def open_report_job_asyncpg_dal(db_manager: AsyncpgManager) -> AsyncGenerator[ReportJobAsyncpgDAL]:
+    async with db_manager.get_conn() as conn:
+        yield ReportJobAsyncpgDAL(_conn=conn)
+
+
+async def get_report_job_asyncpg_dal_factory(db_manager: AsyncpgManagerDep) -> ReportJobDALFactory:
+    return partial(open_report_job_asyncpg_dal, db_manager)
+
+
+ReportJobAsyncpgDALFactoryDep = Annotated[ReportJobDALFactory, Depends(get_report_job_asyncpg_dal_factory)]
+
+
+async def get_report_job_service(
+    person_dal_factory: PersonAsyncpgReadDALFactoryDep,
+    report_job_dal_factory: ReportJobAsyncpgDALFactoryDep,
+    task_runner: TaskRunnerDep,
+) -> ReportJobService:
+    return ReportJobService(
+        person_dal_factory=person_dal_factory,
+        report_job_dal_factory=report_job_dal_factory,
+        task_runner=task_runner,
+        ttl=get_report_job_settings().ttl,
+        lease=get_report_job_settings().lease,
+        prefetch=get_db_settings().cursor_prefetch,
+    )
+
+
+ReportJobServiceDep = Annotated[ReportJobService, Depends(get_report_job_service)]
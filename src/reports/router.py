@@ -1,14 +1,25 @@
-from fastapi import APIRouter, status
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
 
 from src.errors import (
     db_conn_response,
+    not_found_response,
+    payload_too_large_response,
     unexpected_exception_response,
     validation_response,
 )
-from src.persons.schemas import PersonCreate
-from src.reports.dependencies import ReportServiceDep
-from src.reports.schemas import CustomReport, OfficialReport
-from src.reports.service import ReportService
+from src.reports.dependencies import (
+    ReportBuildingServiceDep,
+    ReportIngestingServiceDep,
+    ReportJobServiceDep,
+    ReportServiceDep,
+    ReportStreamingServiceDep,
+)
+from src.reports.schemas import CustomReport, OfficialReport, ReportJob, ReportJobResult, StatisticalReport
+from src.responses import DuplexStreamingResponse
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
@@ -18,11 +29,78 @@ router = APIRouter(prefix="/reports", tags=["Reports"])
     status_code=status.HTTP_200_OK,
     summary="An official report retrieval.",
     response_description="An official report is successfully retrieved.",
+    response_model=OfficialReport,
+    responses={**db_conn_response, **unexpected_exception_response},
+)
+async def get_official_report(report_service: ReportServiceDep) -> Response:
+    """Retrieves and returns a report of all stored persons from their snapshot, which is brought up to date with
+    the persons written since it was taken once it is older than the configured staleness."""
+    return Response(await report_service.create_report(), media_type="application/json")
+
+
+@router.get(
+    "/stream",
+    status_code=status.HTTP_200_OK,
+    summary="An official report streaming.",
+    response_description="An official report is successfully streamed as NDJSON: the first line contains the report "
+    "creation time and each of the following ones contains a person.",
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {"content": {"application/x-ndjson": {}}},
+        **db_conn_response,
+        **unexpected_exception_response,
+    },
+)
+async def stream_official_report(report_service: ReportStreamingServiceDep) -> StreamingResponse:
+    """Streams a report generated of all stored persons, so it can be consumed before it is fully built."""
+    return StreamingResponse(await report_service.stream_report(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/jobs",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="An official report job creation.",
+    response_description="A job building an official report is created, or an unexpired one for the same data is "
+    "reused.",
     responses={**db_conn_response, **unexpected_exception_response},
 )
-async def get_official_report(report_service: ReportServiceDep) -> OfficialReport:
-    """Retrieves and returns a report generated of all stored persons."""
-    return await report_service.create_report()
+async def create_official_report_job(report_service: ReportJobServiceDep) -> ReportJob:
+    """Creates and returns a job that builds a report of all stored persons in the background, so the request does not
+    wait for it."""
+    return await report_service.create_job()
+
+
+@router.get(
+    "/jobs/{job_id}",
+    status_code=status.HTTP_200_OK,
+    summary="An official report job retrieval.",
+    response_description="A job is successfully retrieved together with its report once it is done.",
+    response_model=ReportJobResult,
+    responses={
+        **db_conn_response,
+        **not_found_response,
+        **unexpected_exception_response,
+        **validation_response,
+    },
+)
+async def get_official_report_job(job_id: UUID, report_service: ReportJobServiceDep) -> Response:
+    """Retrieves and returns status and progress of a job and its report once it is done."""
+    return Response(await report_service.get_job(job_id), media_type="application/json")
+
+
+@router.get(
+    "/stats",
+    status_code=status.HTTP_200_OK,
+    summary="A statistical report retrieval.",
+    response_description="A statistical report is successfully retrieved.",
+    responses={**db_conn_response, **unexpected_exception_response, **validation_response},
+)
+async def get_statistical_report(
+    report_service: ReportServiceDep,
+    age_group_size: Annotated[int, Query(alias="ageGroupSize", ge=1, le=100)] = 10,
+) -> StatisticalReport:
+    """Retrieves and returns demographics of all stored persons calculated by the database."""
+    return await report_service.create_statistical_report(age_group_size)
 
 
 @router.post(
@@ -30,11 +108,62 @@ async def get_official_report(report_service: ReportServiceDep) -> OfficialRepor
     status_code=status.HTTP_200_OK,
     summary="A custom report retrieval.",
     response_description="A custom report is successfully retrieved.",
+    response_model=CustomReport,
+    responses={
+        **unexpected_exception_response,
+        **validation_response,
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/PersonCreate"}},
+                },
+            },
+        },
+    },
+)
+async def get_custom_report(request: Request, report_service: ReportBuildingServiceDep) -> Response:
+    """Retrieves and returns a report generated of all supplied persons. Large inputs are split into chunks, which are
+    validated by worker processes in parallel."""
+    return Response(await report_service.create_custom_report(await request.body()), media_type="application/json")
+
+
+@router.post(
+    "/stream",
+    status_code=status.HTTP_200_OK,
+    summary="A custom report streaming.",
+    response_description="A custom report is successfully streamed as NDJSON: the first line contains the report "
+    "creation time and each of the following ones contains a person. Input found invalid or too large after the first "
+    "line is reported by a last line containing an error.",
+    response_class=DuplexStreamingResponse,
     responses={
+        status.HTTP_200_OK: {"content": {"application/x-ndjson": {}}},
+        **payload_too_large_response,
         **unexpected_exception_response,
         **validation_response,
     },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                media_type: {"schema": {"$ref": "#/components/schemas/PersonCreate"}}
+                for media_type in ("application/json", "application/x-ndjson")
+            },
+        },
+    },
 )
-def get_custom_report(persons: list[PersonCreate]) -> CustomReport:
-    """Retrieves and returns a report generated of all supplied persons."""
-    return ReportService.create_custom_report(persons)
+async def stream_custom_report(
+    request: Request,
+    report_service: ReportIngestingServiceDep,
+) -> DuplexStreamingResponse:
+    """Streams a report of persons supplied as a JSON array or NDJSON, which are read and validated as they arrive,
+    so the input is never held in memory as a whole."""
+    return DuplexStreamingResponse(
+        await report_service.stream_custom_report(
+            request.stream(),
+            ndjson=request.headers.get("content-type", "").startswith("application/x-ndjson"),
+        ),
+        media_type="application/x-ndjson",
+    )
@@ -1,19 +1,23 @@
 from datetime import datetime
-from typing import Annotated, Generic, TypeVar
+from typing import Annotated, Generic, Literal, TypeVar
+from uuid import UUID
 
 from pydantic import Field
 
-from src.persons.schemas import Person, PersonCreate
-from src.schemas import Schema
+from src.persons.schemas import Person, PersonCreate, PersonStatistics
+from src.schemas import Error, Schema
 
 PersonT = TypeVar("PersonT")
 
 
-class Report(Schema, Generic[PersonT]):
+class ReportHeader(Schema):
     created_at: Annotated[
         datetime,
         Field(default_factory=datetime.now, examples=["2025-01-01T00:00:00.000000"]),
     ]
+
+
+class Report(ReportHeader, Generic[PersonT]):
     persons: list[PersonT]
 
 
@@ -23,3 +27,23 @@ class OfficialReport(Report[Person]):
 
 class CustomReport(Report[PersonCreate]):
     pass
+
+
+class StatisticalReport(ReportHeader, PersonStatistics):
+    pass
+
+
+class ReportError(Schema):
+    error: Error
+
+
+class ReportJob(Schema):
+    id: Annotated[UUID, Field(examples=["3f0b7a52-6c1e-4f2a-9d8b-5e1c2a7d4b90"])]
+    status: Annotated[Literal["pending", "running", "done", "failed"], Field(examples=["running"])]
+    progress: Annotated[float, Field(ge=0, le=1, examples=[0.5])]
+    created_at: Annotated[datetime, Field(examples=["2025-01-01T00:00:00.000000+00:00"])]
+    expires_at: Annotated[datetime, Field(examples=["2025-01-01T01:00:00.000000+00:00"])]
+
+
+class ReportJobResult(ReportJob):
+    report: OfficialReport | None = None
@@ -1,19 +1,295 @@
+from asyncio import create_task, gather, sleep
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Callable, Iterable
 from dataclasses import dataclass
+from typing import Any, Literal, cast
+from uuid import UUID
 
-from src.persons.data_access_layer import PersonDAL
-from src.persons.schemas import PersonCreate
-from src.reports.schemas import CustomReport, OfficialReport
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json
+
+from src.errors import NotFoundError, PayloadError, PayloadTooLargeError
+from src.executors import ProcessPool, TaskRunner, read_shared, share
+from src.persons.data_access_layer import PersonDALFactory
+from src.persons.schemas import Person, PersonCreate
+from src.reports.data_access_layer import ReportJobDALFactory
+from src.reports.schemas import CustomReport, ReportError, ReportHeader, ReportJob, StatisticalReport
+from src.schemas import Error, JSONItemsParser, to_ndjson
+
+PERSONS_ADAPTER: TypeAdapter[list[PersonCreate]] = TypeAdapter(list[PersonCreate])
+STORED_PERSONS_ADAPTER: TypeAdapter[list[Person]] = TypeAdapter(list[Person])
+
+PROGRESS_STEP: float = 0.01
+HEARTBEATS_PER_LEASE: int = 3
 
 
 @dataclass(kw_only=True, frozen=True, slots=True)
 class ReportService:
-    person_dal: PersonDAL
+    person_read_dal_factory: PersonDALFactory
+    person_snapshot_dal_factory: PersonDALFactory
+    staleness: float
+    prefetch: int
+
+    async def create_report(self) -> bytes:
+        # The snapshot is read in the transaction that has refreshed it, since a replica could still lag behind it.
+        async with self.person_snapshot_dal_factory() as person_dal:
+            await person_dal.refresh_snapshot(self.staleness)
+            created_at, parts = await person_dal.read_snapshot(self.prefetch)
+
+        return _to_report_json(ReportHeader(created_at=created_at), (part.encode() for part in parts))
 
-    async def create_report(self) -> OfficialReport:
-        persons = await self.person_dal.read_all()
+    async def create_statistical_report(self, age_group_size: int) -> StatisticalReport:
+        async with self.person_read_dal_factory() as person_dal:
+            statistics = await person_dal.read_statistics(age_group_size)
 
-        return OfficialReport(persons=persons)
+        return StatisticalReport.model_validate(statistics, from_attributes=True)
 
     @staticmethod
     def create_custom_report(persons: list[PersonCreate]) -> CustomReport:
         return CustomReport(persons=persons)
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
+class ReportBuildingService:
+    process_pool: ProcessPool | None
+    threshold: int
+    chunk_size: int
+
+    async def create_custom_report(self, body: bytes) -> bytes:
+        if not body or len(body) < self.threshold or self.process_pool is None:
+            parts = [await run_in_threadpool(_build_persons, body)]
+        else:
+            size = self.process_pool.size
+            with share(body) as name:
+                parts = await gather(
+                    *(
+                        self.process_pool.run(_build_shared_persons, name, len(body), index, size, self.chunk_size)
+                        for index in range(size)
+                    ),
+                )
+
+        if errors := [error for part in parts if isinstance(part, list) for error in part]:
+            raise RequestValidationError(errors)
+
+        return _to_report_json(ReportHeader(), (part for part in parts if isinstance(part, bytes)))
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
+class ReportJobService:
+    person_dal_factory: PersonDALFactory
+    report_job_dal_factory: ReportJobDALFactory
+    task_runner: TaskRunner
+    ttl: float
+    lease: float
+    prefetch: int
+
+    async def create_job(self) -> ReportJob:
+        async with self.person_dal_factory() as person_dal:
+            revision = await person_dal.read_revision()
+
+        while True:
+            async with self.report_job_dal_factory() as report_job_dal:
+                await report_job_dal.delete_expired()
+                await report_job_dal.fail_stale(self.lease)
+                if (job := await report_job_dal.create(revision, self.ttl)) is not None:
+                    break
+                if (job := await report_job_dal.read_by_revision(revision)) is not None:
+                    return job
+
+        # The job is built only after its row is committed, so its updates cannot miss it.
+        self.task_runner.submit(self._build(job.id))
+        return job
+
+    async def get_job(self, job_id: UUID) -> bytes:
+        async with self.report_job_dal_factory() as report_job_dal:
+            # A client polling a job whose worker has died sees it fail without waiting for another job to be created.
+            await report_job_dal.fail_stale(self.lease)
+            if (job := await report_job_dal.read(job_id)) is None:
+                raise NotFoundError("Report job not found.")
+            result = await report_job_dal.read_result(job_id) if job.status == "done" else None
+
+        return job.model_dump_json(by_alias=True).encode()[:-1] + b',"report":' + (result or "null").encode() + b"}"
+
+    async def _build(self, job_id: UUID) -> None:
+        heartbeat = create_task(self._beat(job_id))
+        try:
+            report = await self._build_report(job_id)
+        except BaseException:
+            await self._update(job_id, "failed")
+            raise
+        finally:
+            heartbeat.cancel()
+            await gather(heartbeat, return_exceptions=True)
+
+        async with self.report_job_dal_factory() as report_job_dal:
+            await report_job_dal.finish(job_id, report.decode())
+
+    async def _build_report(self, job_id: UUID) -> bytes:
+        header, parts = ReportHeader(), []
+        await self._update(job_id, "running", 0.0)
+
+        async with self.person_dal_factory() as person_dal:
+            total, done, reported = await person_dal.read_count(), 0, 0.0
+            async for persons in person_dal.stream_all(self.prefetch):
+                parts.append(STORED_PERSONS_ADAPTER.dump_json(persons, by_alias=True)[1:-1])
+                done += len(persons)
+                if (progress := done / max(total, done)) - reported >= PROGRESS_STEP:
+                    await self._update(job_id, "running", progress)
+                    reported = progress
+
+        return _to_report_json(header, parts)
+
+    async def _beat(self, job_id: UUID) -> None:
+        # A job whose worker has died stops beating, and it is failed once its lease has passed.
+        while True:
+            await sleep(self.lease / HEARTBEATS_PER_LEASE)
+            async with self.report_job_dal_factory() as report_job_dal:
+                await report_job_dal.beat(job_id)
+
+    async def _update(self, job_id: UUID, status: Literal["running", "failed"], progress: float | None = None) -> None:
+        async with self.report_job_dal_factory() as report_job_dal:
+            await report_job_dal.update(job_id, status, progress)
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
+class ReportStreamingService:
+    person_dal_factory: PersonDALFactory
+    prefetch: int
+
+    async def stream_report(self) -> AsyncIterator[bytes]:
+        chunks = self._stream_report()
+
+        return _prepend(await anext(chunks), chunks)
+
+    async def _stream_report(self) -> AsyncGenerator[bytes]:
+        async with self.person_dal_factory() as person_dal:
+            yield to_ndjson([ReportHeader()])
+
+            async for persons in person_dal.stream_all(self.prefetch):
+                yield to_ndjson(persons)
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
+class ReportIngestingService:
+    max_size: int
+    max_rows: int
+    max_row_size: int
+
+    async def stream_custom_report(self, chunks: AsyncIterable[bytes], *, ndjson: bool) -> AsyncIterator[bytes]:
+        report = self._stream_custom_report(chunks, ndjson=ndjson)
+
+        return _prepend(await anext(report), report)
+
+    async def _stream_custom_report(self, chunks: AsyncIterable[bytes], *, ndjson: bool) -> AsyncGenerator[bytes]:
+        batches = self._read_persons(chunks, ndjson=ndjson)
+        first: list[PersonCreate] = await anext(batches, [])
+        yield to_ndjson([ReportHeader(), *first])
+
+        # The status is sent with the first line, so a later failure is reported by the last one.
+        try:
+            async for persons in batches:
+                yield to_ndjson(persons)
+        except PayloadError as exc:
+            yield _to_error_ndjson(exc, "Correct your input.")
+        except PayloadTooLargeError as exc:
+            yield _to_error_ndjson(exc, "Split your input into smaller parts.")
+
+    async def _read_persons(self, chunks: AsyncIterable[bytes], *, ndjson: bool) -> AsyncGenerator[list[PersonCreate]]:
+        parser = JSONItemsParser(ndjson=ndjson, max_item_size=self.max_row_size)
+        size = rows = 0
+
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > self.max_size:
+                raise PayloadTooLargeError
+
+            if items := self._parse(parser.feed, chunk):
+                yield self._validate(items, rows)
+                rows += len(items)
+
+        if items := self._parse(parser.close):
+            yield self._validate(items, rows)
+
+    @staticmethod
+    def _parse(func: Callable[..., list[Any]], *args: Any) -> list[Any]:
+        try:
+            return func(*args)
+        except ValueError as exc:
+            raise PayloadError(str(exc)) from exc
+
+    def _validate(self, items: list[Any], offset: int) -> list[PersonCreate]:
+        if offset + len(items) > self.max_rows:
+            raise PayloadTooLargeError(f"Payload has more than {self.max_rows} rows.")
+
+        try:
+            return PERSONS_ADAPTER.validate_python(items)
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            index, *loc = error["loc"]
+            raise PayloadError(f"{error['msg']}: {'.'.join(map(str, ('body', offset + int(index), *loc)))}.") from exc
+
+
+def _to_error_ndjson(exc: ValueError, way_to_solve: str) -> bytes:
+    return to_ndjson([ReportError(error=Error(reason=exc.args[0], ways_to_solve=[way_to_solve]))])
+
+
+def _to_report_json(header: ReportHeader, parts: Iterable[bytes]) -> bytes:
+    persons = b",".join(part for part in parts if part)
+
+    return header.model_dump_json(by_alias=True).encode()[:-1] + b',"persons":[' + persons + b"]}"
+
+
+def _build_shared_persons(
+    name: str,
+    size: int,
+    index: int,
+    count: int,
+    chunk_size: int,
+) -> bytes | list[dict[str, Any]]:
+    # Runs in worker processes: each one parses the whole input, but validates only its own share of the items.
+    body = read_shared(name, size)
+    try:
+        items = from_json(body)
+    except ValueError:
+        items = None
+
+    if not isinstance(items, list):
+        # Reported once, with the same locations as small payloads.
+        return _build_persons(body) if index == 0 else b""
+
+    first, last = len(items) * index // count, len(items) * (index + 1) // count
+    parts = [
+        _build_persons(items[start : min(start + chunk_size, last)], start) for start in range(first, last, chunk_size)
+    ]
+    if errors := [error for part in parts if isinstance(part, list) for error in part]:
+        return errors
+
+    return b",".join(part for part in parts if isinstance(part, bytes))
+
+
+def _build_persons(body: bytes | list[Any], offset: int = 0) -> bytes | list[dict[str, Any]]:
+    # Runs in worker processes, so only bytes and plain errors cross the process boundary.
+    try:
+        if isinstance(body, bytes):
+            persons = PERSONS_ADAPTER.validate_json(body)
+        else:
+            persons = PERSONS_ADAPTER.validate_python(body)
+    except ValidationError as exc:
+        errors = exc.errors(include_url=False, include_context=False)
+        for error in errors:
+            if error["loc"]:
+                index, *loc = error["loc"]
+                error["loc"] = (offset + int(index), *loc)
+            error["loc"] = ("body", *error["loc"])
+
+        return cast("list[dict[str, Any]]", errors)
+
+    return PERSONS_ADAPTER.dump_json(persons, by_alias=True)[1:-1]
+
+
+async def _prepend(first: bytes, rest: AsyncIterator[bytes]) -> AsyncGenerator[bytes]:
+    yield first
+
+    async for chunk in rest:
+        yield chunk
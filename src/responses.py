@@ -0,0 +1,16 @@
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    # The base class listens for a disconnect by reading from «receive» while streaming, which would steal the chunks
+    # of a request body that is still being read. Here the body reader notices a disconnect itself.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError as exc:
+            raise ClientDisconnect from exc
+
+        if self.background is not None:
+            await self.background()
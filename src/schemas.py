@@ -1,14 +1,21 @@
-from collections.abc import Awaitable, Callable, Sequence
-from functools import wraps
-from typing import Annotated, Any, Generic, TypeVar, cast
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from codecs import getincrementaldecoder
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
+from typing import Annotated, Any, Generic, Literal, TypeVar, cast
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from pydantic.alias_generators import to_camel
+from pydantic_core import from_json, to_json
 
 NonEmptyStr = Annotated[str, Field(min_length=1)]
 
 SchemaT = TypeVar("SchemaT", bound="Schema")
 
+_set_attr = object.__setattr__
+
 
 class Schema(BaseModel):
     model_config = ConfigDict(
@@ -29,13 +36,37 @@ class Schema(BaseModel):
         return cast(Callable[[Any, SchemaT, Any], Awaitable[Any]], wrapper)
 
 
+def construct[SchemaT: Schema](schema: type[SchemaT], res: Any) -> SchemaT:
+    values = dict(res)
+    if values.keys() != schema.model_fields.keys():
+        values = {field: values[field] for field in schema.model_fields}
+
+    instance = schema.__new__(schema)
+    _set_attr(instance, "__dict__", values)
+    _set_attr(instance, "__pydantic_fields_set__", set(values))
+    _set_attr(instance, "__pydantic_extra__", None)
+    _set_attr(instance, "__pydantic_private__", None)
+
+    return instance
+
+
 class OneTransformer(Generic[SchemaT]):
+    def __init__(self, *, trusted: bool = False) -> None:
+        self.trusted = trusted
+
     def __call__(self, res: Any, schema: type[SchemaT]) -> SchemaT:
+        if self.trusted:
+            return construct(schema, res)
         return schema(**dict(res))
 
 
 class ManyTransformer(Generic[SchemaT]):
+    def __init__(self, *, trusted: bool = False) -> None:
+        self.trusted = trusted
+
     def __call__(self, seq: Sequence[Any], schema: type[SchemaT]) -> list[SchemaT]:
+        if self.trusted:
+            return [construct(schema, res) for res in seq]
         return [schema(**dict(res)) for res in seq]
 
 
@@ -53,12 +84,172 @@ def from_res(
     return decorator
 
 
-def from_dict() -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
-    return from_res(OneTransformer())
+def from_stream[SchemaT: Schema](
+    transformer: Callable[[Any, type[SchemaT]], Any],
+) -> Callable[[Callable[..., AsyncIterator[Any]]], Callable[..., AsyncGenerator[Any]]]:
+    def decorator(func: Callable[..., AsyncIterator[Any]]) -> Callable[..., AsyncGenerator[Any]]:
+        @wraps(func)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> AsyncGenerator[Any]:
+            async for res in func(self, *args, **kwargs):
+                yield transformer(res, self.schema)
+
+        return wrapper
+
+    return decorator
+
+
+def from_dict(*, trusted: bool = False) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    return from_res(OneTransformer(trusted=trusted))
+
+
+def from_dicts(*, trusted: bool = False) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    return from_res(ManyTransformer(trusted=trusted))
+
+
+def from_batches(
+    *,
+    trusted: bool = False,
+) -> Callable[[Callable[..., AsyncIterator[Any]]], Callable[..., AsyncGenerator[Any]]]:
+    return from_stream(ManyTransformer(trusted=trusted))
+
+
+def to_ndjson(schemas: Iterable[Schema]) -> bytes:
+    return b"".join(schema.__pydantic_serializer__.to_json(schema, by_alias=True) + b"\n" for schema in schemas)
+
+
+@dataclass(kw_only=True, slots=True, eq=False)
+class JSONItemsParser:
+    ndjson: bool
+    max_item_size: int
+
+    buffer: str = ""
+    state: Literal["start", "first", "item", "end"] = "start"
+    scanned: int = 0
+    depth: int = 0
+    in_string: bool = False
+    decoder: Any = field(default_factory=getincrementaldecoder("utf-8"))
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        self.buffer += self.decoder.decode(chunk)
+        return self._parse_lines() if self.ndjson else self._parse_array()
+
+    def close(self) -> list[Any]:
+        self.buffer += self.decoder.decode(b"", final=True)
+        if self.ndjson:
+            self.buffer += "\n"
+            return self._parse_lines()
+
+        items = self._parse_array()
+        if self.state != "end":
+            raise ValueError("JSON array is not complete.")
+
+        return items
+
+    def _parse_lines(self) -> list[Any]:
+        *lines, self.buffer = self.buffer.split("\n")
+        if len(self.buffer) > self.max_item_size or any(len(line) > self.max_item_size for line in lines):
+            raise ValueError("Line is too long.")
+
+        return [from_json(line) for line in lines if line.strip()]
+
+    def _parse_array(self) -> list[Any]:
+        items = []
+        buffer, start, pos = self.buffer, 0, self.scanned
+        while self.state != "end":
+            if self.state == "start":
+                if (pos := _skip_whitespace(buffer, pos)) == len(buffer):
+                    break
+                if buffer[pos] != "[":
+                    raise ValueError("JSON array is expected.")
+                self.state, start, pos = "first", pos + 1, pos + 1
+                continue
+
+            # An item is decoded only once a delimiter after it is seen, so a split scalar is never taken for a whole.
+            pos, found = self._find_delimiter(buffer, pos)
+            if pos - start > self.max_item_size:
+                raise ValueError("Array item is too long.")
+            if not found:
+                break
+
+            if text := buffer[start:pos].strip():
+                items.append(from_json(text))
+            elif self.state == "item" or buffer[pos] == ",":
+                raise ValueError("Array item is expected.")
+            self.state, start, pos = "item" if buffer[pos] == "," else "end", pos + 1, pos + 1
+
+        if self.state == "end" and buffer[start:].strip():
+            raise ValueError("Data after the end of JSON array.")
+
+        self.buffer, self.scanned = buffer[start:], pos - start
+        return items
+
+    def _find_delimiter(self, buffer: str, pos: int) -> tuple[int, bool]:
+        while pos < len(buffer):
+            if self.in_string:
+                pos = self._skip_string(buffer, pos)
+                if self.in_string:
+                    return pos, False
+                continue
+
+            if (match := _STRUCTURE.search(buffer, pos)) is None:
+                break
+            char, pos = match.group(), match.end()
+            if char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            elif self.depth and char in "]}":
+                self.depth -= 1
+            elif not self.depth and char in ",]":
+                return match.start(), True
+
+        return len(buffer), False
+
+    def _skip_string(self, buffer: str, pos: int) -> int:
+        while (match := _STRING_END.search(buffer, pos)) is not None:
+            if match.group() == '"':
+                self.in_string = False
+                return match.end()
+            # An escape split across chunks is scanned again with the next chunk.
+            if match.end() == len(buffer):
+                return match.start()
+            pos = match.end() + 1
+
+        return len(buffer)
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRUCTURE = re.compile(r'[\[\]{}",]')
+_STRING_END = re.compile(r'["\\]')
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return cast("re.Match[str]", _WHITESPACE.match(text, pos)).end()
+
+
+@lru_cache
+def get_field_adapter(schema: type[Schema], field: str) -> TypeAdapter[Any]:
+    return TypeAdapter(schema.model_fields[field].annotation)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    return urlsafe_b64encode(to_json(values)).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    values = from_json(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    if not isinstance(values, list):
+        raise TypeError("Cursor must contain a list of key values.")
+
+    return values
 
 
-def from_dicts() -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
-    return from_res(ManyTransformer())
+class Page[ItemT](Schema):
+    items: list[ItemT]
+    next: Annotated[
+        str | None,
+        Field(examples=["WyI5NGUyZjE0Yy00ZDhmLTRkNWUtOWI0ZC1lMGUyZjU3NTk3ZjgiXQ"]),
+    ] = None
 
 
 class Error(Schema):
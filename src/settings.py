@@ -7,6 +7,8 @@ from pydantic import (
     EmailStr,
     Field,
     HttpUrl,
+    NonNegativeFloat,
+    NonNegativeInt,
     PositiveFloat,
     PositiveInt,
     field_validator,
@@ -14,6 +16,7 @@ from pydantic import (
 from pydantic_extra_types.semantic_version import SemanticVersion
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from src.compression import CodecName
 from src.schemas import NonEmptyStr
 
 LOGGER: logging.Logger = logging.getLogger("uvicorn.error")
@@ -39,10 +42,53 @@ class APISettings(Settings):
         PositiveFloat,
         Field(validation_alias="external_api_timeout"),
     ] = 10.0
+    batch_size: Annotated[
+        PositiveInt,
+        Field(validation_alias="external_api_batch_size"),
+    ] = 1000
+    prefetch_low: Annotated[
+        NonNegativeInt,
+        Field(validation_alias="external_api_prefetch_low"),
+    ] = 100
+    prefetch_high: Annotated[
+        NonNegativeInt,
+        Field(validation_alias="external_api_prefetch_high"),
+    ] = 1000
+
+    max_connections: Annotated[
+        PositiveInt,
+        Field(validation_alias="external_api_max_connections"),
+    ] = 100
+    max_keepalive_connections: Annotated[
+        NonNegativeInt,
+        Field(validation_alias="external_api_max_keepalive_connections"),
+    ] = 20
+    keepalive_expiry: Annotated[
+        NonNegativeFloat,
+        Field(validation_alias="external_api_keepalive_expiry"),
+    ] = 5.0
+
+    breaker_window: Annotated[
+        NonNegativeInt,
+        Field(validation_alias="external_api_breaker_window"),
+    ] = 20
+    breaker_failure_rate: Annotated[
+        float,
+        Field(gt=0, le=1, validation_alias="external_api_breaker_failure_rate"),
+    ] = 0.5
+    breaker_reset_timeout: Annotated[
+        PositiveFloat,
+        Field(validation_alias="external_api_breaker_reset_timeout"),
+    ] = 30.0
+    hedging_quantile: Annotated[
+        float,
+        Field(ge=0, lt=1, validation_alias="external_api_hedging_quantile"),
+    ] = 0.95
 
 
 class DBSettings(Settings):
     host: Annotated[NonEmptyStr, Field(validation_alias="db_host")]
+    replica_hosts: Annotated[list[NonEmptyStr] | None, Field(validation_alias="db_replica_hosts")] = None
     user: Annotated[NonEmptyStr, Field(validation_alias="db_user")]
     password: Annotated[NonEmptyStr, Field(validation_alias="db_password")]
     db_name: NonEmptyStr
@@ -51,7 +97,11 @@ class DBSettings(Settings):
     pool_max_size: Annotated[PositiveInt, Field(serialization_alias="max_size")] = 10
     max_queries: PositiveInt = 50000
     max_inactive_connection_lifetime: PositiveFloat = 300.0
+    statement_cache_size: NonNegativeInt = 100
+    prepare_statements: bool = True
     timeout: Annotated[PositiveFloat, Field(validation_alias="db_timeout")] = 5.0
+    cursor_prefetch: PositiveInt = 1000
+    listen_changes: bool = True
 
 
 class TrustedHostsSettings(Settings):
@@ -112,19 +162,112 @@ class CORSSettings(Settings):
 class CompressionSettings(Settings):
     min_size: Annotated[
         PositiveInt | None,
-        Field(serialization_alias="minimum_size"),
+        Field(validation_alias="compression_min_size", serialization_alias="minimum_size"),
     ] = None
-    level: Annotated[
+    codecs: Annotated[
+        list[CodecName] | None,
+        Field(validation_alias="compression_codecs", min_length=1),
+    ] = None
+    large_size: Annotated[
         PositiveInt | None,
-        Field(serialization_alias="compresslevel", le=9),
+        Field(validation_alias="compression_large_size"),
     ] = None
+    cache_size: Annotated[
+        NonNegativeInt,
+        Field(validation_alias="compression_cache_size"),
+    ] = 32 * 1024 * 1024
+
+
+class CacheSettings(Settings):
+    ttl: Annotated[
+        PositiveFloat,
+        Field(validation_alias="response_cache_ttl"),
+    ] = 60.0
+    size: Annotated[
+        NonNegativeInt,
+        Field(validation_alias="response_cache_size"),
+    ] = 32 * 1024 * 1024
+    replica_lag: Annotated[
+        NonNegativeFloat,
+        Field(validation_alias="response_cache_replica_lag"),
+    ] = 1.0
+
+
+class IngestSettings(Settings):
+    max_size: Annotated[
+        PositiveInt,
+        Field(validation_alias="ingest_max_size"),
+    ] = 256 * 1024 * 1024
+    max_rows: Annotated[
+        PositiveInt,
+        Field(validation_alias="ingest_max_rows"),
+    ] = 1_000_000
+    max_row_size: Annotated[
+        PositiveInt,
+        Field(validation_alias="ingest_max_row_size"),
+    ] = 16 * 1024
+
+
+class SearchSettings(Settings):
+    timeout: Annotated[
+        float,
+        Field(ge=0.001, validation_alias="search_timeout"),
+    ] = 0.1
+
+
+class AdmissionSettings(Settings):
+    limits: Annotated[
+        dict[NonEmptyStr, PositiveInt],
+        Field(validation_alias="admission_limits"),
+    ] = {"read": 5, "write": 3, "report": 2}
+    budget: Annotated[
+        PositiveFloat,
+        Field(validation_alias="admission_budget"),
+    ] = 1.0
+
+
+class ReportSnapshotSettings(Settings):
+    staleness: Annotated[
+        NonNegativeFloat,
+        Field(validation_alias="report_snapshot_staleness"),
+    ] = 0.0
+
+
+class ReportJobSettings(Settings):
+    ttl: Annotated[
+        PositiveFloat,
+        Field(validation_alias="report_job_ttl"),
+    ] = 3600.0
+    lease: Annotated[
+        PositiveFloat,
+        Field(validation_alias="report_job_lease"),
+    ] = 30.0
+    concurrency: Annotated[
+        PositiveInt,
+        Field(validation_alias="report_job_concurrency"),
+    ] = 1
+
+
+class ProcessPoolSettings(Settings):
+    size: Annotated[
+        NonNegativeInt,
+        Field(validation_alias="process_pool_size"),
+    ] = 0
+    threshold: Annotated[
+        NonNegativeInt,
+        Field(validation_alias="process_pool_threshold"),
+    ] = 1024 * 1024
+    chunk_size: Annotated[
+        PositiveInt,
+        Field(validation_alias="process_pool_chunk_size"),
+    ] = 10_000
 
 
 class DocsSettings(Settings):
     title: Annotated[NonEmptyStr, Field(max_length=50)]
     summary: Annotated[str | None, Field(min_length=5, max_length=150)] = None
     description: Annotated[str | None, Field(min_length=5, max_length=500)] = None
-    version: Annotated[SemanticVersion, AfterValidator(lambda value: str(value))]
+    version: Annotated[SemanticVersion, AfterValidator(str)]
     terms_of_service: HttpUrl | None = None
     contact: dict[str, NonEmptyStr | HttpUrl | EmailStr] | None = None
     license: Annotated[
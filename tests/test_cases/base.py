@@ -6,25 +6,29 @@ import pytest
 import pytest_asyncio
 from asgi_lifespan import LifespanManager
 from asyncpg.pool import PoolConnectionProxy
+from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
 
 from src.db.db_manager import AsyncpgManager
 from src.dependencies import get_api_settings
-from src.main import app
-from src.persons.dependencies import get_fakerapi_client
-from tests.utils.clients import MockClient
+from src.main import create_app
+from src.persons.dependencies import get_fakerapi_bulk_client, get_fakerapi_client
+from tests.utils.clients import get_mock_bulk_client, get_mock_client
 
 
 class TestAPI(ABC):
     route: str
     timeout: float = get_api_settings().timeout
 
-    @pytest.fixture(scope="session", autouse=True)
-    def mock(self) -> None:
-        app.dependency_overrides[get_fakerapi_client] = lambda: MockClient()
+    @pytest.fixture
+    def app(self) -> FastAPI:
+        app = create_app()
+        app.dependency_overrides[get_fakerapi_client] = get_mock_client
+        app.dependency_overrides[get_fakerapi_bulk_client] = get_mock_bulk_client
+        return app
 
     @pytest_asyncio.fixture()
-    async def session(self) -> AsyncGenerator[AsyncClient]:
+    async def session(self, app: FastAPI) -> AsyncGenerator[AsyncClient]:
         async with (
             LifespanManager(app) as manager,
             AsyncClient(
@@ -0,0 +1,81 @@
+from dataclasses import replace
+from time import monotonic
+
+import pytest
+from asgi_lifespan import LifespanManager
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+
+from src.cache import CachedResponse, MemoryCacheBackend
+from src.dependencies import get_admission_controller, get_compression_cache, get_docs_settings
+from src.main import create_app
+from tests.test_cases.base import TestAPI
+
+
+class TestApp:
+    @pytest.mark.asyncio
+    async def test_warm_up(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("OPENAPI", "/openapi.json")
+        get_docs_settings.cache_clear()
+        try:
+            async with (
+                LifespanManager(create_app()) as manager,
+                AsyncClient(transport=ASGITransport(app=manager.app), base_url="http://test") as session,
+            ):
+                hits = get_compression_cache().hits
+                response = await session.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+                identity = await session.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+        finally:
+            get_docs_settings.cache_clear()
+
+        assert all(
+            (
+                response.headers["Content-Encoding"] == "gzip",
+                get_compression_cache().hits == hits + 1,
+                "Content-Encoding" not in identity.headers,
+                response.headers["Vary"] == identity.headers["Vary"] == "Accept-Encoding",
+            ),
+        )
+
+
+class TestAdmissionAPI(TestAPI):
+    route: str = "/api/persons/search"
+
+    @pytest.mark.asyncio
+    async def test_shed(self, session: AsyncClient) -> None:
+        route_class = get_admission_controller().route_classes["read"]
+        route_class.active, route_class.duration = route_class.limit, 60.0
+        try:
+            response = await session.get(self.route, params={"q": "Rosa"})
+        finally:
+            route_class.active, route_class.duration = 0, 0.0
+        admitted = await session.get(self.route, params={"q": "Rosa"})
+        metrics = await session.get("/metrics")
+
+        assert all(
+            (
+                response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE,
+                int(response.headers["Retry-After"]) > 1,
+                admitted.status_code == status.HTTP_200_OK,
+                'admission_decisions_total{route_class="read",decision="rejected"}' in metrics.text,
+            ),
+        )
+
+
+class TestMemoryCacheBackend:
+    @pytest.mark.asyncio
+    async def test_replica_lag(self) -> None:
+        backend = MemoryCacheBackend(size=1024, lag=60.0)
+        await backend.invalidate("person")
+        response = CachedResponse(
+            headers=[],
+            body=b"[]",
+            etag=CachedResponse.make_etag(b"[]"),
+            tags=frozenset(("person",)),
+            created_at=monotonic(),
+            expires_at=monotonic() + 60.0,
+        )
+        await backend.set("/api/persons", response)
+        await backend.set("/api/reports", replace(response, tags=frozenset(("report",))))
+
+        assert all((await backend.get("/api/persons") is None, await backend.get("/api/reports") is not None))
@@ -0,0 +1,86 @@
+from asyncio import Event, timeout
+
+import pytest
+
+from src.cache import INVALIDATOR
+from src.data_access_layer import STATEMENTS, AsyncpgUnitOfWork
+from src.db.db_manager import AsyncpgManager
+from src.dependencies import open_unit_of_work
+from src.persons.data_access_layer import PersonAsyncpgDAL
+from src.persons.schemas import PersonFilter
+
+
+class TestAsyncpgManager:
+    @pytest.mark.asyncio
+    async def test_get_conn(self, db_manager: AsyncpgManager) -> None:
+        async with db_manager.get_conn() as conn:
+            write = conn.is_in_transaction()
+        async with db_manager.get_conn(read_only=True) as conn:
+            read = conn.is_in_transaction()
+
+        assert all((write, not read))
+
+    @pytest.mark.asyncio
+    async def test_prepared_statements(self, db_manager: AsyncpgManager) -> None:
+        hits, misses = STATEMENTS.hits, STATEMENTS.misses
+        async with db_manager.get_conn() as conn:
+            dal = PersonAsyncpgDAL(_conn=conn)
+            await dal.read_all()
+            for _ in range(2):
+                await dal.read_page(10, filters=PersonFilter(gender="other"))
+
+        assert all((STATEMENTS.hits == hits + 2, STATEMENTS.misses == misses + 1))
+
+    @pytest.mark.asyncio
+    async def test_listen_changes(self, db_manager: AsyncpgManager) -> None:
+        changed = Event()
+
+        async def on_change(*tags: str) -> None:
+            if "person" in tags:
+                changed.set()
+
+        INVALIDATOR.subscribe(on_change)
+        try:
+            async with db_manager.get_conn() as conn:
+                await conn.execute("DELETE FROM person")
+            async with timeout(db_manager.timeout):
+                await changed.wait()
+        finally:
+            INVALIDATOR.unsubscribe(on_change)
+
+    @pytest.mark.asyncio
+    async def test_relisten(self, db_manager: AsyncpgManager) -> None:
+        listener = db_manager.listener
+        relistened = Event()
+
+        async def on_change(*tags: str) -> None:
+            if "person" in tags and db_manager.listener is not listener:
+                relistened.set()
+
+        assert listener is not None
+        INVALIDATOR.subscribe(on_change)
+        try:
+            async with db_manager.get_conn() as conn:
+                await conn.execute("SELECT pg_terminate_backend($1)", listener.get_server_pid())
+            async with timeout(db_manager.timeout):
+                await relistened.wait()
+
+            relistened.clear()
+            async with db_manager.get_conn() as conn:
+                await conn.execute("DELETE FROM person")
+            async with timeout(db_manager.timeout):
+                await relistened.wait()
+        finally:
+            INVALIDATOR.unsubscribe(on_change)
+
+
+class TestAsyncpgUnitOfWork:
+    @pytest.mark.asyncio
+    async def test_get_dal(self, db_manager: AsyncpgManager) -> None:
+        async with open_unit_of_work(db_manager, read_only=True) as unit_of_work:
+            dal = unit_of_work.get_dal(PersonAsyncpgDAL)
+            same = unit_of_work.get_dal(PersonAsyncpgDAL)
+        async with db_manager.get_conn(read_only=True) as conn:
+            other = AsyncpgUnitOfWork(conn=conn).get_dal(PersonAsyncpgDAL)
+
+        assert all((same is dal, other is not dal, other._conn is conn, unit_of_work.closed, not unit_of_work.dals))  # noqa: SLF001
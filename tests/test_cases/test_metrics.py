@@ -0,0 +1,25 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from tests.test_cases.base import TestAPI
+
+
+class TestMetricsAPI(TestAPI):
+    route: str = "/metrics"
+
+    @pytest.mark.asyncio
+    async def test_read(self, session: AsyncClient) -> None:
+        await session.get("/api/persons")
+        response = await session.get(self.route)
+
+        assert all(
+            (
+                response.status_code == status.HTTP_200_OK,
+                'db_pool_connections{pool="primary",state="in_use"}' in response.text,
+                'db_query_seconds_count{dal="PersonAsyncpgDAL",method="read_first"}' in response.text,
+                'cache_lookups_total{cache="statements",result="miss"}' in response.text,
+                'http_response_bytes_count{route="/api/persons",method="GET"}' in response.text,
+                "http_requests_in_flight 1.0" in response.text,
+            ),
+        )
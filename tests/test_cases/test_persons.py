@@ -1,11 +1,26 @@
+from asyncio import CancelledError, Event, Future, ensure_future, sleep, wait_for
+from collections import deque
+from contextlib import suppress
+from datetime import date
+from typing import Any
+from uuid import uuid4
+
 import pytest
-from httpx import AsyncClient
+from asyncpg import Connection
+from fastapi import FastAPI, status
+from httpx import AsyncClient, MockTransport, Request, Response
 
-from tests.test_cases.base import TestAPI
+from src.persons.data_access_layer import PersonAsyncpgDAL
+from src.persons.errors import CircuitOpenError, ExternalAPIError
+from src.persons.schemas import Person, PersonCreate, PersonCreateBatch, PersonFilter, PersonSort
+from src.persons.utils.clients import HTTPClient, PrefetchingClient
+from src.persons.utils.policies import CircuitBreaker, Hedging
+from tests.test_cases.base import TestAPI, TestUnit
 
 
 class TestPersonAPI(TestAPI):
     route: str = "/api/persons"
+    limit: int = 2
 
     @pytest.mark.asyncio
     async def test_create(self, session: AsyncClient) -> None:
@@ -19,3 +34,273 @@ class TestPersonAPI(TestAPI):
                 person["gender"] == "female",
             ),
         )
+
+    @pytest.mark.asyncio
+    async def test_create_prefetched(self, app: FastAPI, session: AsyncClient) -> None:
+        prefetcher = app.state.person_prefetcher
+        await wait_for(prefetcher.filled.wait(), self.timeout)
+        hits = prefetcher.hits
+        response = await session.post(self.route)
+
+        assert all(
+            (
+                response.status_code == status.HTTP_201_CREATED,
+                prefetcher.hits == hits + 1,
+                len(prefetcher.queue) == prefetcher.high - 1,
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_create_many(self, session: AsyncClient) -> None:
+        response = await session.post(f"{self.route}/bulk", params={"count": self.limit + 1})
+        page = (await session.get(self.route, params={"limit": self.limit + 1})).json()
+
+        assert all(
+            (
+                response.status_code == status.HTTP_201_CREATED,
+                sorted(person["id"] for person in response.json()) == [person["id"] for person in page["items"]],
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_read_page(self, session: AsyncClient) -> None:
+        for _ in range(self.limit + 1):
+            await session.post(self.route)
+
+        first = (await session.get(self.route, params={"limit": self.limit})).json()
+        last = (await session.get(self.route, params={"limit": self.limit, "after": first["next"]})).json()
+
+        assert all(
+            (
+                len(first["items"]) == self.limit,
+                len(last["items"]) == 1,
+                last["next"] is None,
+                max(person["id"] for person in first["items"]) < last["items"][0]["id"],
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_read_page_cached(self, session: AsyncClient) -> None:
+        first = await session.get(self.route)
+        cached = await session.get(self.route, headers={"If-None-Match": first.headers["ETag"]})
+        await session.post(self.route)
+        changed = await session.get(self.route, headers={"If-None-Match": first.headers["ETag"]})
+
+        assert all(
+            (
+                cached.status_code == status.HTTP_304_NOT_MODIFIED,
+                changed.status_code == status.HTTP_200_OK,
+                len(changed.json()["items"]) == len(first.json()["items"]) + 1,
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_read_page_invalid_cursor(self, session: AsyncClient) -> None:
+        response = await session.get(self.route, params={"after": "invalid"})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @pytest.mark.asyncio
+    async def test_read_page_filtered(self, session: AsyncClient) -> None:
+        persons = [(await session.post(self.route)).json() for _ in range(self.limit + 1)]
+        params: dict[str, str | int] = {
+            "gender": "female",
+            "lastNamePrefix": "San",
+            "sort": "-birthdate",
+            "limit": self.limit,
+        }
+
+        first = (await session.get(self.route, params=params)).json()
+        last = (await session.get(self.route, params=params | {"after": first["next"]})).json()
+        other = (await session.get(self.route, params={"gender": "male"})).json()
+
+        assert all(
+            (
+                sorted(person["id"] for person in first["items"] + last["items"])
+                == sorted(person["id"] for person in persons),
+                last["next"] is None,
+                other["items"] == [],
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_search(self, session: AsyncClient) -> None:
+        for _ in range(self.limit + 1):
+            await session.post(self.route)
+
+        found = (await session.get(f"{self.route}/search", params={"q": "sanfo", "limit": self.limit})).json()
+        missing = (await session.get(f"{self.route}/search", params={"q": "Xavier"})).json()
+
+        assert all(
+            (
+                len(found) == self.limit,
+                all(person["lastName"] == "Sanford" for person in found),
+                missing == [],
+            ),
+        )
+
+
+class TestPersonAsyncpgDAL(TestUnit):
+    dal_cls = PersonAsyncpgDAL
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("filters", "sort", "index"),
+        [
+            ({"gender": "other"}, "id", "person_gender_idx"),
+            (
+                {"birthdate_from": date(1990, 1, 1), "birthdate_to": date(2000, 1, 1)},
+                "birthdate",
+                "person_birthdate_idx",
+            ),
+            ({}, "-birthdate", "person_birthdate_idx"),
+            ({"first_name": "Rosa"}, "firstName", "person_first_name_idx"),
+            ({"last_name_prefix": "San"}, "-lastName", "person_last_name_idx"),
+            ({"last_name_prefix": "San\ud7ff"}, "lastName", "person_last_name_idx"),
+            ({"last_name_prefix": "San\U0010ffff"}, "lastName", "person_last_name_idx"),
+        ],
+    )
+    async def test_read_page_indexed(
+        self,
+        conn_: Connection,
+        filters: dict[str, Any],
+        sort: PersonSort,
+        index: str,
+    ) -> None:
+        person = Person(
+            id=uuid4(),
+            first_name="Rosa",
+            last_name="Sanford",
+            gender="female",
+            birthdate=date(1999, 3, 16),
+        )
+        await conn_.execute("SET LOCAL enable_seqscan = off")
+
+        plans = []
+        for after in None, [getattr(person, field) for field, _ in self.dal_cls.get_sort_keys(sort)]:
+            query, args = self.dal_cls.build_page_query(10, after, PersonFilter(**filters), sort)
+            plans.append("\n".join(record[0] for record in await conn_.fetch(f"EXPLAIN {query}", *args)))
+
+        assert all(index in plan and "Sort" not in plan for plan in plans)
+
+
+class TestHTTPClient:
+    window: int = 4
+    latency: float = 0.01
+    person: dict[str, str] = {  # noqa: RUF012
+        "firstname": "Rosa",
+        "lastname": "Sanford",
+        "birthday": "1999-03-16",
+        "gender": "female",
+    }
+
+    @pytest.mark.asyncio
+    async def test_breaker(self) -> None:
+        requests: list[Request] = []
+
+        def fail(request: Request) -> Response:
+            requests.append(request)
+            return Response(status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        client = HTTPClient(
+            url="http://test",
+            schema=PersonCreate,
+            session=AsyncClient(transport=MockTransport(fail)),
+            breaker=CircuitBreaker(window=self.window, failure_rate=1, reset_timeout=60),
+        )
+        for _ in range(self.window):
+            with pytest.raises(ExternalAPIError):
+                await client.request("GET")
+
+        with pytest.raises(CircuitOpenError):
+            await client.request("GET")
+        assert len(requests) == self.window
+
+    @pytest.mark.asyncio
+    async def test_breaker_probe(self) -> None:
+        started = Event()
+
+        async def respond(request: Request) -> Response:
+            started.set()
+            await sleep(60)
+            return Response(status.HTTP_200_OK)
+
+        async def start(client: HTTPClient) -> Future[Any]:
+            started.clear()
+            tasks.append(task := ensure_future(client.request("GET")))
+            await started.wait()
+            return task
+
+        breaker = CircuitBreaker(window=1, failure_rate=1, reset_timeout=0)
+        client = HTTPClient(
+            url="http://test",
+            schema=PersonCreate,
+            session=AsyncClient(transport=MockTransport(respond)),
+            breaker=breaker,
+        )
+        tasks: list[Future[Any]] = []
+
+        sent_before = await start(client)
+        breaker.record(success=False)
+        await start(client)
+        sent_before.cancel()
+        with suppress(CancelledError):
+            await sent_before
+        try:
+            with pytest.raises(CircuitOpenError):
+                await client.request("GET")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        assert breaker.probing
+
+    @pytest.mark.asyncio
+    async def test_hedging(self) -> None:
+        requests: list[Request] = []
+
+        async def respond(request: Request) -> Response:
+            requests.append(request)
+            if len(requests) == 1:
+                await sleep(60)
+            return Response(status.HTTP_200_OK, json={"data": [self.person]})
+
+        client = HTTPClient(
+            url="http://test",
+            schema=PersonCreate,
+            session=AsyncClient(transport=MockTransport(respond)),
+            hedging=Hedging(quantile=0.5, min_samples=1, latencies=deque([self.latency])),
+        )
+        person = await wait_for(client.request("GET"), 1)
+
+        assert all((person.first_name == "Rosa", [request.method for request in requests] == ["GET", "GET"]))
+
+    @pytest.mark.asyncio
+    async def test_prefetch_after_error(self) -> None:
+        requests: list[Request] = []
+        failed = Event()
+
+        def respond(request: Request) -> Response:
+            requests.append(request)
+            if len(requests) == 1:
+                failed.set()
+                return Response(status.HTTP_200_OK, json={"data": [{}]})
+            return Response(status.HTTP_200_OK, json={"data": [self.person] * 2})
+
+        prefetcher = PrefetchingClient(
+            client=HTTPClient(
+                url="http://test",
+                schema=PersonCreateBatch,
+                session=AsyncClient(transport=MockTransport(respond)),
+            ),
+            low=0,
+            high=2,
+            batch_size=2,
+        )
+
+        async with prefetcher:
+            await wait_for(failed.wait(), 1)
+            prefetcher.get()
+            await wait_for(prefetcher.filled.wait(), 1)
+
+        assert len(requests) == len(prefetcher.queue) == prefetcher.high
@@ -1,12 +1,25 @@
+import asyncio
+import json
+from collections.abc import AsyncGenerator
 from datetime import date
+from functools import partial
+from typing import Any
+from uuid import UUID
 
 import pytest
-from asyncpg import Connection
+from fastapi import status
+from fastapi.exceptions import RequestValidationError
+from httpx import AsyncClient
 
+from src.db.db_manager import AsyncpgManager
+from src.dependencies import get_db_settings
+from src.executors import ProcessPool
 from src.persons.data_access_layer import PersonAsyncpgDAL
+from src.persons.dependencies import open_person_asyncpg_dal
 from src.persons.schemas import PersonCreate
-from src.reports.service import ReportService
-from tests.test_cases.base import TestUnit
+from src.reports.service import ReportBuildingService, ReportService
+from src.schemas import JSONItemsParser
+from tests.test_cases.base import TestAPI, TestUnit
 
 
 class TestReportService(TestUnit):
@@ -14,8 +27,14 @@ class TestReportService(TestUnit):
     dal_cls = PersonAsyncpgDAL
 
     @pytest.fixture(autouse=True)
-    def set_service(self, conn_: Connection) -> None:
-        self.service = self.service_cls(person_dal=self.dal_cls(_conn=conn_))
+    def set_service(self, db_manager: AsyncpgManager) -> None:
+        self.db_manager = db_manager
+        self.service = self.service_cls(
+            person_read_dal_factory=partial(open_person_asyncpg_dal, db_manager, read_only=True),
+            person_snapshot_dal_factory=partial(open_person_asyncpg_dal, db_manager, isolation="repeatable_read"),
+            staleness=0.0,
+            prefetch=2,
+        )
 
     @pytest.fixture
     def persons(self) -> list[PersonCreate]:
@@ -34,8 +53,202 @@ class TestReportService(TestUnit):
             ),
         ]
 
+    @pytest.mark.asyncio
+    async def test_create_statistical(self, persons: list[PersonCreate]) -> None:
+        async with open_person_asyncpg_dal(self.db_manager) as person_dal:
+            for person in persons:
+                await person_dal.write(person)
+
+        report = await self.service.create_statistical_report(age_group_size=100)
+
+        assert all(
+            (
+                report.total == len(persons),
+                report.genders == {"female": 1, "male": 1},
+                report.age_groups == {0: len(persons)},
+                report.birth_years == {1999: 1, 2001: 1},
+                report.min_age is not None and report.max_age is not None,
+                (report.min_age or 0) <= (report.median_age or 0) <= (report.max_age or 0),
+            ),
+        )
+
     def test_create_custom(self, persons: list[PersonCreate]) -> None:
         report = self.service.create_custom_report(persons=persons)
 
         for person in persons:
             assert person in report.persons
+
+
+class TestReportBuildingService:
+    @pytest.mark.asyncio
+    async def test_create_custom_in_processes(self) -> None:
+        persons = [{"firstName": "Rosa", "lastName": "Sanford", "gender": "female", "birthdate": "1999-03-16"}] * 10
+        process_pool = ProcessPool(size=2)
+        service = ReportBuildingService(process_pool=process_pool, threshold=0, chunk_size=3)
+
+        async with process_pool:
+            report = json.loads(await service.create_custom_report(json.dumps(persons).encode()))
+            with pytest.raises(RequestValidationError) as exc_info:
+                await service.create_custom_report(json.dumps([*persons, {}]).encode())
+
+        assert all(
+            (
+                "createdAt" in report,
+                report["persons"] == persons,
+                exc_info.value.errors()[0]["loc"][:2] == ("body", len(persons)),
+            ),
+        )
+
+
+class TestJSONItemsParser:
+    @staticmethod
+    def parse(body: bytes, *, ndjson: bool = False, max_item_size: int = 100) -> list[Any]:
+        parser = JSONItemsParser(ndjson=ndjson, max_item_size=max_item_size)
+        items = [item for start in range(0, len(body), 2) for item in parser.feed(body[start : start + 2])]
+        return [*items, *parser.close()]
+
+    def test_split_items(self) -> None:
+        body = b'[12, 34, "5,]\\"", {"a": [6]}]'
+
+        assert self.parse(body) == [12, 34, '5,]"', {"a": [6]}]
+
+    def test_long_items(self) -> None:
+        with pytest.raises(ValueError, match="Array item is too long."):
+            self.parse(b"[1, 23456]", max_item_size=4)
+        with pytest.raises(ValueError, match="Line is too long."):
+            self.parse(b"1\n23456\n", ndjson=True, max_item_size=4)
+
+
+class TestReportAPI(TestAPI):
+    route: str = "/api/reports"
+    concurrency: int = get_db_settings().pool_max_size + 1
+
+    @pytest.mark.asyncio
+    async def test_stream(self, session: AsyncClient) -> None:
+        persons = [(await session.post("/api/persons")).json() for _ in range(3)]
+
+        response = await session.get(f"{self.route}/stream")
+        header, *lines = map(json.loads, response.text.splitlines())
+
+        assert all(
+            (
+                response.headers["content-type"] == "application/x-ndjson",
+                "createdAt" in header,
+                sorted(lines, key=lambda person: person["id"]) == sorted(persons, key=lambda person: person["id"]),
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_get(self, session: AsyncClient) -> None:
+        persons = [(await session.post("/api/persons")).json() for _ in range(2)]
+        first = (await session.get(self.route)).json()
+        persons.append((await session.post("/api/persons")).json())
+        second = (await session.get(self.route)).json()
+
+        assert all(
+            (
+                sorted(first["persons"], key=lambda person: person["id"])
+                == sorted(persons[:2], key=lambda person: person["id"]),
+                sorted(second["persons"], key=lambda person: person["id"])
+                == sorted(persons, key=lambda person: person["id"]),
+                second["createdAt"] > first["createdAt"],
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_concurrent(self, session: AsyncClient) -> None:
+        await session.post("/api/persons")
+        responses = await asyncio.gather(
+            *(session.get(self.route) for _ in range(self.concurrency)),
+        )
+
+        assert all(response.status_code == status.HTTP_200_OK for response in responses)
+
+    async def wait_for_job(self, session: AsyncClient, job_id: str) -> Any:
+        async with asyncio.timeout(self.timeout):
+            while True:
+                job = (await session.get(f"{self.route}/jobs/{job_id}")).json()
+                if job["status"] == "done":
+                    return job
+                await asyncio.sleep(0.01)
+
+    @pytest.mark.asyncio
+    async def test_job(self, session: AsyncClient) -> None:
+        persons = [(await session.post("/api/persons")).json() for _ in range(3)]
+
+        job = (await session.post(f"{self.route}/jobs")).json()
+        result = await self.wait_for_job(session, job["id"])
+        reused = (await session.post(f"{self.route}/jobs")).json()
+
+        assert all(
+            (
+                result["progress"] == 1,
+                sorted(result["report"]["persons"], key=lambda person: person["id"])
+                == sorted(persons, key=lambda person: person["id"]),
+                reused["id"] == job["id"],
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_job_stale(self, session: AsyncClient, db_manager: AsyncpgManager) -> None:
+        job = await self.wait_for_job(session, (await session.post(f"{self.route}/jobs")).json()["id"])
+        async with db_manager.get_conn() as conn:
+            await conn.execute(
+                "UPDATE report SET status = 'running', heartbeat_at = now() - interval '1 hour' WHERE id = $1",
+                UUID(job["id"]),
+            )
+        stale = (await session.get(f"{self.route}/jobs/{job['id']}")).json()
+        replaced = (await session.post(f"{self.route}/jobs")).json()
+
+        assert all((replaced["id"] != job["id"], stale["status"] == "failed"))
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("content_type", ["application/json", "application/x-ndjson"])
+    async def test_stream_custom(self, session: AsyncClient, content_type: str) -> None:
+        persons = [{"firstName": "Rosa", "lastName": "Sanford", "gender": "female", "birthdate": "1999-03-16"}] * 100
+        if content_type == "application/json":
+            body = json.dumps(persons).encode()
+        else:
+            body = b"".join(json.dumps(person).encode() + b"\n" for person in persons)
+
+        async def chunks() -> AsyncGenerator[bytes]:
+            for start in range(0, len(body), 7):
+                yield body[start : start + 7]
+
+        response = await session.post(f"{self.route}/stream", content=chunks(), headers={"Content-Type": content_type})
+        header, *lines = map(json.loads, response.text.splitlines())
+
+        assert all((response.status_code == status.HTTP_200_OK, "createdAt" in header, lines == persons))
+
+    @pytest.mark.asyncio
+    async def test_stream_custom_invalid_tail(self, session: AsyncClient) -> None:
+        persons = [{"firstName": "Rosa", "lastName": "Sanford", "gender": "female", "birthdate": "1999-03-16"}] * 100
+        body = json.dumps([*persons, {}]).encode()
+
+        async def chunks() -> AsyncGenerator[bytes]:
+            for start in range(0, len(body), 7):
+                yield body[start : start + 7]
+
+        response = await session.post(f"{self.route}/stream", content=chunks())
+        header, *lines, error = map(json.loads, response.text.splitlines())
+
+        assert all(
+            (
+                response.status_code == status.HTTP_200_OK,
+                "createdAt" in header,
+                lines == persons,
+                error["error"]["reason"] == "Field required: body.100.firstName.",
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_stream_custom_invalid(self, session: AsyncClient) -> None:
+        persons = [{"firstName": "Rosa", "lastName": "Sanford", "gender": "female", "birthdate": "1999-03-16"}] * 2
+        response = await session.post(f"{self.route}/stream", json=[*persons, {}])
+
+        assert all(
+            (
+                response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY,
+                response.json()[0]["reason"] == "Field required: body.2.firstName.",
+            ),
+        )
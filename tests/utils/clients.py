@@ -1,11 +1,13 @@
+from dataclasses import dataclass
 from typing import Any
 
-from src.persons.schemas import PersonCreate
-from src.schemas import from_dict
+from src.persons.schemas import PersonCreate, PersonCreateBatch
+from src.schemas import Schema, from_dict
 
 
+@dataclass(kw_only=True, slots=True)
 class MockClient:
-    schema = PersonCreate
+    schema: type[Schema] = PersonCreate
 
     @from_dict()
     async def request(self, method: str, **kwargs: Any) -> dict[str, Any]:
@@ -20,5 +22,14 @@ class MockClient:
                     "birthday": "1999-03-16",
                     "gender": "female",
                 },
-            ],
+            ]
+            * kwargs.get("params", {}).get("_quantity", 1),
         }
+
+
+def get_mock_client() -> MockClient:
+    return MockClient()
+
+
+def get_mock_bulk_client() -> MockClient:
+    return MockClient(schema=PersonCreateBatch)